@@ -0,0 +1,59 @@
+"""Benchmark discovering usernames from the saved test pages.
+
+Compares :func:`mal_scraper.user_discovery.discover_users_from_html` with the
+case-insensitive regex which it replaced. Run from the repository root::
+
+    python benchmarks/bench_user_discovery.py
+"""
+
+import glob
+import os
+import re
+import timeit
+
+from mal_scraper.user_discovery import discover_users_from_html
+
+PAGES_GLOB = os.path.join(
+    os.path.dirname(__file__), '..', 'tests', 'mal_scraper', '*_responses', '*',
+)
+
+# The previous implementation
+_username_regex = re.compile(
+    r"href=[\"'](https?\://myanimelist\.net)?/profile/(?P<username>\w+)[\w/]*[\"']",
+    re.ASCII | re.DOTALL | re.IGNORECASE,
+)
+
+
+def discover_users_with_regex(html):
+    return set(m.group('username') for m in _username_regex.finditer(html))
+
+
+def discover_users_from_bytes(html):
+    return set(discover_users_from_html(html, unique=True))
+
+
+def main(number=20, repeat=5):
+    pages = []
+    for path in sorted(glob.glob(PAGES_GLOB)):
+        with open(path, 'rb') as file:
+            pages.append(file.read())
+
+    texts = [page.decode('utf-8', 'replace') for page in pages]
+    for page, text in zip(pages, texts):
+        assert discover_users_from_bytes(page) == discover_users_with_regex(text)
+
+    print('%d pages, %d bytes in total' % (len(pages), sum(map(len, pages))))
+    benchmarks = (
+        ('regex (str)', discover_users_with_regex, texts),
+        ('discover_users_from_html (str)', discover_users_from_bytes, texts),
+        ('discover_users_from_html (bytes)', discover_users_from_bytes, pages),
+    )
+    for name, func, args in benchmarks:
+        seconds = min(timeit.repeat(
+            lambda: [func(arg) for arg in args], number=number, repeat=repeat,
+        ))
+        print('%-34s %8.2fms per pass' % (name, seconds / number * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -81,5 +81,8 @@ setup(
     install_requires=requirements,
     extras_require={
         'develop': dev_requirements,
+        'lxml': ['lxml'],
+        'numpy': ['numpy'],
+        'arrow': ['pyarrow'],
     },
 )
@@ -1,11 +1,17 @@
 __version__ = "0.3.0"
 
 # Import Public API
-from .anime import get_anime  # noqa
-from .consts import AgeRating, AiringStatus, ConsumptionStatus, Format, Season  # noqa
+from .anime import get_anime, get_anime_many  # noqa
+from .consts import (  # noqa
+    AgeRating, AiringStatus, ConsumptionStatus, Failed, Format, ResponseSummary, Retrieved,
+    Season,
+)
 from .exceptions import ParseError, RequestError  # noqa
 from .user_discovery import discover_users  # noqa
-from .users import get_user_anime_list, get_user_stats  # noqa
+from .users import (  # noqa
+    get_user_anime_list, get_user_anime_list_changes, get_user_stats, get_user_stats_many,
+    iter_user_anime_list,
+)
 
 # Don't use this :) It's here for the tests
 _FORCE_HTTP = False
@@ -0,0 +1,255 @@
+"""Asynchronous (asyncio) versions of the public API (Python 3.5+).
+
+These make the same requests and return the same results as their synchronous
+counterparts, but many calls can be in flight at once::
+
+    import httpx
+    from mal_scraper import aio
+
+    async def get_many_anime(id_refs):
+        async with httpx.AsyncClient() as client:
+            requester = aio.BoundedRequester(client, limit=10)
+            return await asyncio.gather(*(
+                aio.get_anime_async(id_ref, requester) for id_ref in id_refs
+            ))
+
+The requester must be asynchronous: `await requester.get(url)` returns a
+requests-like response (with `status_code`, `content`, `text`, `json()` and
+`raise_for_status()`), for example an `httpx.AsyncClient`. Wrap an
+`aiohttp.ClientSession` with :class:`AiohttpRequester`.
+
+The responses are processed by the same parsers as the synchronous API but in
+an executor (a thread pool by default) so that parsing does not block the
+event loop.
+"""
+
+import asyncio
+import logging
+from functools import partial
+
+import requests
+
+from .anime import _process_anime_response, get_url_from_id_ref
+from .requester import SessionRequester, default_limiter, get_retry_delay
+from .user_discovery import (
+    _process_discovery_response, default_discovery_hook, get_url_for_user_discovery,
+)
+from .users import (
+    _process_anime_list_response, _process_user_stats_response, default_anime_list_limiter,
+    get_anime_list_url_for_user, get_profile_url_for_user,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def get_anime_async(id_ref, requester, parser=None, fast_path=False, executor=None,
+                          result_cache=None, record_type=None, meta_policy='full'):
+    """Return the information for a particular show, see :func:`mal_scraper.get_anime`.
+
+    Args:
+        id_ref (int): Internal show identifier.
+        requester (async requests-like): Asynchronous HTTP request maker.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+        fast_path (bool or str, optional): See :func:`mal_scraper.anime.get_anime_from_html`.
+        executor (concurrent.futures.Executor, optional): Where to process the
+            web-page, defaults to the event loop's default executor.
+        result_cache (mal_scraper.cache.ResultCache, optional): See :func:`mal_scraper.get_anime`.
+        record_type (type, optional): See :func:`mal_scraper.get_anime`.
+        meta_policy (str, optional): See :func:`mal_scraper.get_anime`.
+
+    Returns:
+        :class:`.Retrieved`: with the attributes `meta` and `data`.
+    """
+    url = get_url_from_id_ref(id_ref)
+    logger.debug('Retrieving anime "%s" from "%s"', id_ref, url)
+
+    response = await requester.get(url)
+    return await _run_in_executor(
+        executor, _process_anime_response, id_ref, response, parser, fast_path,
+        result_cache, record_type, meta_policy,
+    )
+
+
+async def get_user_stats_async(user_id, requester, parser=None, executor=None,
+                               result_cache=None, record_type=None, meta_policy='full'):
+    """Return statistics about a particular user, see :func:`mal_scraper.get_user_stats`.
+
+    Args:
+        user_id (string): The username identifier of the MAL user.
+        requester (async requests-like): Asynchronous HTTP request maker.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+        executor (concurrent.futures.Executor, optional): Where to process the
+            web-page, defaults to the event loop's default executor.
+        result_cache (mal_scraper.cache.ResultCache, optional):
+            See :func:`mal_scraper.get_user_stats`.
+        record_type (type, optional): See :func:`mal_scraper.get_user_stats`.
+        meta_policy (str, optional): See :func:`mal_scraper.get_user_stats`.
+
+    Returns:
+        :class:`.Retrieved`: with the attributes `meta` and `data`.
+    """
+    url = get_profile_url_for_user(user_id)
+    logger.debug('Retrieving profile for "%s" from "%s"', user_id, url)
+
+    response = await requester.get(url)
+    return await _run_in_executor(
+        executor, _process_user_stats_response, user_id, response, parser,
+        result_cache, record_type, meta_policy,
+    )
+
+
+async def get_user_anime_list_async(user_id, requester, executor=None,
+                                    limiter=default_anime_list_limiter):
+    """Return the anime listed by the user, see :func:`mal_scraper.get_user_anime_list`.
+
+    Args:
+        user_id (str): The user identifier (i.e. the username).
+        requester (async requests-like): Asynchronous HTTP request maker.
+        executor (concurrent.futures.Executor, optional): Where to process the
+            pages, defaults to the event loop's default executor.
+        limiter (limiter, optional): Sleep for `limiter.reserve(url)` before
+            every request, or None to not wait. See :mod:`mal_scraper.ratelimit`.
+
+    Returns:
+        A list of anime-info dicts.
+    """
+    anime = []
+    while True:
+        url = get_anime_list_url_for_user(user_id, len(anime))
+        logger.debug('(Network) Retrieving anime list from "%s"', url)
+        if limiter is not None:
+            await asyncio.sleep(limiter.reserve(url))
+
+        response = await requester.get(url)
+        additional_anime = await _run_in_executor(
+            executor, _process_anime_list_response, user_id, response,
+        )
+        if not additional_anime:
+            return anime
+
+        anime.extend(additional_anime)
+
+
+async def discover_users_async(requester, use_cache=True, use_web=None, executor=None):
+    """Return a set of user_ids, see :func:`mal_scraper.discover_users`.
+
+    Args:
+        requester (async requests-like): Asynchronous HTTP request maker.
+        use_cache (bool, optional): Get and clear the cache of discovered users.
+        use_web (bool, optional): Control whether to fall back to scraping.
+        executor (concurrent.futures.Executor, optional): Where to process the
+            web-page, defaults to the event loop's default executor.
+
+    Returns:
+        A set of user_ids which are strings.
+    """
+    discovered_users = set()
+
+    if use_cache:
+        await _run_in_executor(executor, default_discovery_hook.flush)
+        discovered_users |= default_discovery_hook.store.get_and_clear_cache()
+
+    # Force use web, or fall-back to web if the cache is empty
+    if use_web or (use_web is None and not discovered_users):
+        response = await requester.get(get_url_for_user_discovery())
+        discovered_users |= await _run_in_executor(
+            executor, _process_discovery_response, response,
+        )
+
+    return discovered_users
+
+
+def _run_in_executor(executor, func, *args):
+    loop = asyncio.get_event_loop()
+    return loop.run_in_executor(executor, partial(func, *args))
+
+
+class BoundedRequester:
+    """Limit the number of requests in flight through an asynchronous requester.
+
+    Args:
+        requester (async requests-like): The requester to limit.
+        limit (int): The maximum number of concurrent requests.
+        limiter (limiter, optional): Also limit the rate of requests by
+            sleeping for `limiter.reserve(url)` (and give it
+            `limiter.feedback(url, response)` if it has that method), or None
+            to not limit. Defaults to the limiter shared with the synchronous
+            API (see :mod:`mal_scraper.requester`). See :mod:`mal_scraper.ratelimit`.
+        max_retries (int, optional): The number of times to retry 429/503
+            responses (after waiting on the limiter again, or for their
+            Retry-After without a limiter) before returning them.
+        backoff_factor (float, optional): Without a limiter, wait
+            backoff_factor * 2^(retry - 1) seconds before retrying a response
+            without a Retry-After.
+
+    Raises:
+        TypeError: If the limiter has no `reserve` method (waiting on a
+            blocking `wait` would block the event loop).
+    """
+
+    def __init__(self, requester, limit, limiter=default_limiter, max_retries=3,
+                 backoff_factor=0.5):
+        if limiter is not None and not hasattr(limiter, 'reserve'):
+            raise TypeError('The limiter must have a reserve(url) method, not only wait(url)')
+
+        self.requester = requester
+        self.limit = limit
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._semaphore = None  # Created lazily inside the event loop
+
+    async def get(self, url, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+
+        # Retry throttled responses as SessionRequester.get does
+        for retry in range(self.max_retries):
+            response = await self._get_once(url, **kwargs)
+            if response.status_code not in SessionRequester.THROTTLE_STATUSES:
+                return response
+
+            if self.limiter is None:  # (Otherwise the limiter waits before the retry)
+                await asyncio.sleep(get_retry_delay(response, retry, self.backoff_factor))
+
+        return await self._get_once(url, **kwargs)
+
+    async def _get_once(self, url, **kwargs):
+        limiter = self.limiter
+        if limiter is not None:
+            # Reserve our slot without blocking the event loop
+            await asyncio.sleep(limiter.reserve(url))
+
+        async with self._semaphore:
+            response = await self.requester.get(url, **kwargs)
+
+        if hasattr(limiter, 'feedback'):
+            limiter.feedback(url, response)
+
+        return response
+
+
+class AiohttpRequester:
+    """Adapt an `aiohttp.ClientSession` into an asynchronous requester.
+
+    The body is read in full and returned as a `requests.Response` so that it
+    can be processed by the usual parsers.
+
+    Args:
+        session (aiohttp.ClientSession): The session to make requests with.
+    """
+
+    def __init__(self, session):
+        self.session = session
+
+    async def get(self, url, **kwargs):
+        async with self.session.get(url, **kwargs) as aio_response:
+            response = requests.Response()
+            response.status_code = aio_response.status
+            response.reason = aio_response.reason
+            response.url = str(aio_response.url)
+            response.headers = requests.structures.CaseInsensitiveDict(aio_response.headers)
+            response.encoding = aio_response.charset
+            response._content = await aio_response.read()
+
+        return response
@@ -1,19 +1,29 @@
+import codecs
 import itertools
 import logging
+import re
 from datetime import datetime
+from functools import partial
+from html import unescape
 
-from bs4 import BeautifulSoup
-
-from .consts import AgeRating, AiringStatus, Format, Retrieved, Season
-from .exceptions import MissingTagError, ParseError
+from .concurrency import parse_with_memo, retrieve_many
+from .consts import AgeRating, AiringStatus, Failed, Format, Retrieved, Season
+from .exceptions import MissingTagError, ParseError, RequestError
 from .mal_utils import get_date
-from .requester import request_passthrough
-from .user_discovery import default_user_store
+from .meta import make_meta
+from .parsing import get_response_encoding, make_class_strainer, make_soup
+from .records import make_record
+from .requester import default_requester
+from .user_discovery import default_discovery_hook
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the data extracted from the web-page changes (see mal_scraper.cache.ResultCache)
+PARSER_VERSION = 1
+
 
-def get_anime(id_ref=1, requester=request_passthrough):
+def get_anime(id_ref=1, requester=default_requester, parser=None, fast_path=False,
+              result_cache=None, record_type=None, meta_policy='full'):
     """Return the information for a particular show.
 
     You can simply enumerate through id_refs.
@@ -29,6 +39,16 @@ def get_anime(id_ref=1, requester=request_passthrough):
         id_ref (int, optional): Internal show identifier.
         requester (requests-like, optional): HTTP request maker.
             This allows us to control/limit/mock requests.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+            See :mod:`mal_scraper.parsing`.
+        fast_path (bool or str, optional): Process the web-page without
+            building a soup where possible. See :func:`get_anime_from_html`.
+        result_cache (mal_scraper.cache.ResultCache, optional): Reuse the data
+            parsed from an identical web-page before (e.g. with a response cache).
+        record_type (type, optional): Return the data as
+            :class:`mal_scraper.records.AnimeRecord` rather than a dict.
+        meta_policy (str, optional): What to keep of the response in
+            `meta['response']`: 'full', 'summary' or 'none'. See :mod:`mal_scraper.meta`.
 
     Returns:
         :class:`.Retrieved`: with the attributes `meta` and `data`.
@@ -59,6 +79,8 @@ def get_anime(id_ref=1, requester=request_passthrough):
 
     Raises:
         Network and Request Errors: See Requests library.
+        .RequestError: :code:`RequestError.Code.does_not_exist` if the id_ref
+            is invalid (i.e. there is no such anime). See :class:`.RequestError.Code`.
         .ParseError: Upon processing the web-page including anything that does
             not meet expectations.
 
@@ -70,6 +92,8 @@ def get_anime(id_ref=1, requester=request_passthrough):
 
             try:
                 meta, data = mal_scraper.get_anime(next_anime)
+            except mal_scraper.RequestError as err:
+                pass  # The anime does not exist (err.code)
             except mal_scraper.ParseError as err:
                 logger.error('Investigate page %s with error %d', err.url, err.code)
             except NetworkandRequestErrors:  # Pseudo-code (TODO: These docs)
@@ -79,26 +103,112 @@ def get_anime(id_ref=1, requester=request_passthrough):
 
             next_anime = meta['id_ref'] + 1
     """
+    response = _get_anime_response(id_ref, requester)
+    parse = partial(get_anime_from_html, parser=parser, fast_path=fast_path)
+    data = parse_with_memo(  # May raise
+        parse, _bind(result_cache), response.content, get_response_encoding(response),
+    )
+    return _make_retrieved(id_ref, response, make_record(record_type, data), meta_policy)
+
+
+def get_anime_many(id_refs, concurrency=4, ordered=True, requester=default_requester,
+                   parser=None, fast_path=False, processes=None, chunksize=1,
+                   result_cache=None, record_type=None, meta_policy='summary'):
+    """Generate the information for many shows which are retrieved concurrently.
+
+    The id_refs are consumed lazily and only `concurrency` shows are in flight
+    at a time, so this can sweep through every id_ref with flat memory.
+
+    Args:
+        id_refs (iterable of int): Internal show identifiers.
+        concurrency (int, optional): The number of shows to retrieve at once.
+        ordered (bool, optional): Generate in the order of the id_refs (True),
+            or as soon as each show is retrieved (False).
+        requester (requests-like, optional): HTTP request maker, which must be
+            thread-safe.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+        fast_path (bool or str, optional): See :func:`get_anime_from_html`.
+        processes (int, optional): Parse the web-pages in this many processes
+            to use every core, rather than on the retrieving threads. Parsing
+            is CPU bound so this is much faster on a multi-core machine.
+        chunksize (int, optional): The number of web-pages to send to a process
+            at once (when using processes).
+        result_cache (mal_scraper.cache.ResultCache, optional): See :func:`get_anime`.
+        record_type (type, optional): See :func:`get_anime`.
+        meta_policy (str, optional): See :func:`get_anime`. Only a summary of
+            each response is kept by default so that memory stays flat.
+
+    Yields:
+        :class:`.Retrieved` as for :func:`get_anime`, or :class:`.Failed` with
+        the error for that id_ref (e.g. a :class:`.RequestError` if the anime
+        does not exist, a :class:`.ParseError` with its tag, or a network error).
+
+    Examples:
+
+        Retrieve the first 100 anime::
+
+            for result in mal_scraper.get_anime_many(range(1, 101), concurrency=8):
+                if isinstance(result, mal_scraper.Failed):
+                    mycode.log_error(result.meta['id_ref'], result.error)
+                else:
+                    mycode.save_data(result.data, when=result.meta['when'])
+
+        Retrieve them using 8 threads and parse them using 4 processes::
+
+            mal_scraper.get_anime_many(id_refs, concurrency=8, processes=4, chunksize=4)
+    """
+    fetch = partial(_get_anime_response, requester=requester)
+    parse = partial(get_anime_from_html, parser=parser, fast_path=fast_path)
+    results = retrieve_many(
+        id_refs, fetch, parse, concurrency, ordered, processes, chunksize, _bind(result_cache),
+    )
+
+    for id_ref, response, data, error in results:
+        if error is None:
+            data = make_record(record_type, data)
+            yield _make_retrieved(id_ref, response, data, meta_policy)
+        else:
+            yield Failed({'when': datetime.utcnow(), 'id_ref': id_ref}, error)
+
+
+def _bind(result_cache):
+    return None if result_cache is None else result_cache.bind('anime', PARSER_VERSION)
+
+
+def _get_anime_response(id_ref, requester):
+    """Return the checked response to the anime's web-page (see get_anime)."""
     url = get_url_from_id_ref(id_ref)
     logger.debug('Retrieving anime "%s" from "%s"', id_ref, url)
 
     response = requester.get(url)
+    _check_anime_response(id_ref, response)
+    return response
+
+
+def _check_anime_response(id_ref, response):
+    if response.status_code == 404:
+        msg = 'Anime #%d does not exist' % id_ref
+        raise RequestError(RequestError.Code.does_not_exist, msg)
+
     response.raise_for_status()  # May raise
-    # TODO: Raise RequestError if 404
 
     # Dynamic user discovery
-    default_user_store.store_users_from_html(response.text)
+    default_discovery_hook.submit(response.content)
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    data = get_anime_from_soup(soup)  # May raise
 
-    meta = {
-        'when': datetime.utcnow(),
-        'id_ref': id_ref,
-        'response': response,
-    }
+def _process_anime_response(id_ref, response, parser=None, fast_path=False, result_cache=None,
+                            record_type=None, meta_policy='full'):
+    """Return the Retrieved anime from the response to its web-page (see get_anime)."""
+    _check_anime_response(id_ref, response)
+    parse = partial(get_anime_from_html, parser=parser, fast_path=fast_path)
+    data = parse_with_memo(  # May raise
+        parse, _bind(result_cache), response.content, get_response_encoding(response),
+    )
+    return _make_retrieved(id_ref, response, make_record(record_type, data), meta_policy)
 
-    return Retrieved(meta, data)
+
+def _make_retrieved(id_ref, response, data, meta_policy='full'):
+    return Retrieved(make_meta(meta_policy, response, id_ref=id_ref), data)
 
 
 def get_url_from_id_ref(id_ref):
@@ -108,6 +218,125 @@ def get_url_from_id_ref(id_ref):
     return '{}://myanimelist.net/anime/{:d}'.format(protocol, id_ref)
 
 
+def get_anime_from_html(html, parser=None, full_page=False, fast_path=False, from_encoding=None):
+    """Return the anime information from the HTML of an anime's web-page.
+
+    Args:
+        html (bytes or str): The web-page.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+            See :mod:`mal_scraper.parsing`.
+        full_page (bool, optional): Build the soup for the whole page rather
+            than only the parts of the page that we use.
+        fast_path (bool or str, optional): True to scan the HTML with regular
+            expressions instead of building a soup, falling back to the soup
+            if anything fails. 'verify' to use both, logging any differences
+            (see :func:`get_anime_fast_path_differences`) and returning the
+            result from the soup.
+        from_encoding (str, optional): The encoding of the (bytes) web-page,
+            e.g. from the response's Content-Type header. Defaults to the
+            one it declares, see :func:`mal_scraper.parsing.make_soup`.
+
+    Returns:
+        A data dictionary, see :func:`get_anime_from_soup`.
+
+    Raises:
+        ParseError: If any component of the page could not be processed
+            or was unexpected.
+    """
+    if fast_path == 'verify':
+        fast_result, soup_result = _get_anime_by_both_paths(
+            html, parser, full_page, from_encoding,
+        )
+        differences = _get_differences(fast_result, soup_result)
+        if differences:
+            logger.warning('Fast path differs from the soup: %s', differences)
+
+        if isinstance(soup_result, ParseError):
+            raise soup_result
+        return soup_result
+
+    if fast_path and _is_utf8(html, from_encoding):
+        try:
+            return _get_anime_by_fast_path(html, parser, full_page, from_encoding)
+        except ParseError as err:
+            logger.debug('Fast path failed on tag %s, falling back to the soup', err.tag)
+
+    return _get_anime_by_soup(html, parser, full_page, from_encoding)
+
+
+def get_anime_fast_path_differences(html, parser=None, full_page=False):
+    """Return where the fast path and the soup disagree about an anime's web-page.
+
+    Args:
+        html (bytes or str): The web-page.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+        full_page (bool, optional): Build the soup for the whole page.
+
+    Returns:
+        A dict of the differing tags to (fast path, soup) values, which is empty
+        when they agree. A path that fails has the ParseError as the value of
+        the tag that failed.
+    """
+    return _get_differences(*_get_anime_by_both_paths(html, parser, full_page))
+
+
+def _get_anime_by_fast_path(html, parser=None, full_page=False, from_encoding=None):
+    # (The fast path only reads UTF-8 web-pages)
+    if not _is_utf8(html, from_encoding):
+        raise ParseError('The fast path cannot read a page encoded as "%s"' % from_encoding)
+
+    return _get_anime_from_texts(_get_texts_from_html(html))
+
+
+def _is_utf8(html, from_encoding):
+    """Return whether the web-page is a str, or bytes which are UTF-8 (by default)."""
+    if isinstance(html, str) or from_encoding is None:
+        return True
+
+    try:
+        return codecs.lookup(from_encoding).name == 'utf-8'
+    except LookupError:
+        return False
+
+
+def _get_anime_by_soup(html, parser=None, full_page=False, from_encoding=None):
+    parse_only = None if full_page else _soup_strainer
+    return get_anime_from_soup(make_soup(html, parser, parse_only, from_encoding))
+
+
+# The name (h1) and sidebar are the only parts of the page we use
+_soup_strainer = make_class_strainer('h1', 'js-scrollfix-bottom')
+
+
+def _get_anime_by_both_paths(html, parser, full_page, from_encoding=None):
+    """Return the (fast path, soup) results where a failure is given as the ParseError."""
+    results = []
+    for func in (_get_anime_by_fast_path, _get_anime_by_soup):
+        try:
+            results.append(func(html, parser, full_page, from_encoding))
+        except ParseError as err:
+            results.append(err)
+
+    return results
+
+
+def _get_differences(fast_result, soup_result):
+    def as_dict(result):
+        return {result.tag: result} if isinstance(result, ParseError) else result
+
+    def differ(fast_value, soup_value):
+        both_failed = isinstance(fast_value, ParseError) and isinstance(soup_value, ParseError)
+        return not both_failed and fast_value != soup_value
+
+    # A failure stops processing so later tags are unknown rather than different
+    fast_data, soup_data = as_dict(fast_result), as_dict(soup_result)
+    return {
+        tag: (fast_data[tag], soup_data[tag])
+        for tag in fast_data.keys() & soup_data.keys()
+        if differ(fast_data[tag], soup_data[tag])
+    }
+
+
 def get_anime_from_soup(soup):
     """Return the anime information from a soup of HTML.
 
@@ -141,6 +370,15 @@ def get_anime_from_soup(soup):
         ParseError: If any component of the page could not be processed
             or was unexpected.
     """
+    return _get_anime_from_texts(_get_texts_from_soup(soup))
+
+
+def _get_anime_from_texts(texts):
+    """Return the anime information from the texts of the web-page.
+
+    The texts are found either from the soup or directly from the HTML
+    (the fast path) so both are processed identically.
+    """
     process = [
         ('name', _get_name),
         ('name_english', _get_english_name),
@@ -162,7 +400,7 @@ def get_anime_from_soup(soup):
     data = {}
     for tag, func in process:
         try:
-            result = func(soup, data)
+            result = func(texts, data)
         except ParseError as err:
             logger.debug('Failed to process tag %s', tag)
             err.specify_tag(tag)
@@ -173,37 +411,120 @@ def get_anime_from_soup(soup):
     return data
 
 
-def _get_name(soup, data=None):
-    tag = soup.find('span', itemprop='name')
-    if not tag:
-        raise MissingTagError('name')
+# --- Find the Texts from the Soup ---
 
-    text = tag.string
-    return text
 
+def _get_texts_from_soup(soup):
+    """Return a dict of the sidebar's labels (e.g. "Type:") to the text of their values.
 
-def _get_english_name(soup, data=None):
-    pretag = soup.find('span', string='English:')
+    The name (under 'name') and the number of people scoring (under 'Scored by:')
+    are included too.
+    """
+    labels = _get_sidebar_labels(soup)
+    texts = {label: _get_value_text(tag) for label, tag in labels.items()}
 
-    # This is not always present (https://myanimelist.net/anime/15)
-    if not pretag:
-        return ''
+    name_tag = soup.find('span', itemprop='name')
+    texts['name'] = str(name_tag.string) if name_tag and name_tag.string else None
+
+    score_tag = labels.get('Score:')
+    if score_tag:
+        count_tags = score_tag.find_next_siblings('span', limit=2)
+        texts['Scored by:'] = count_tags[1].string if len(count_tags) == 2 else None
+
+    return texts
+
+
+def _get_sidebar_labels(soup):
+    """Return a dict of the sidebar's label text (e.g. "Type:") to its span tag.
+
+    The sidebar is walked once so that every extractor is a dictionary lookup
+    rather than another scan through the whole page.
+    """
+    # Fall back to the whole page in case MAL changes the sidebar markup
+    sidebar = soup.find('div', class_='js-scrollfix-bottom') or soup
+
+    labels = {}
+    for tag in sidebar.find_all('span'):
+        if tag.string:
+            labels.setdefault(str(tag.string), tag)  # The first tag wins, like soup.find
+
+    return labels
+
+
+def _get_value_text(pretag):
+    """Return the stripped text following the label, or None.
+
+    The value is either plain text, or the text of a link/span after the label
+    (e.g. "Type: <a>TV</a>").
+    """
+    for tag in itertools.islice(pretag.next_siblings, 3):
+        text = tag.string
+        if text and text.strip():
+            return text.strip()
+
+    return None
+
+
+# --- Find the Texts from the HTML (Fast Path) ---
+
+
+_fast_name_regex = re.compile(rb'<h1[^>]*>\s*<span itemprop="name">([^<]*)</span>')
+_fast_label_regex = re.compile(
+    rb'<span class="dark_text">([^<]+)</span>\s*(?:<(?:a|span)\b[^>]*>)?([^<]*)'
+)
+_fast_scored_by_regex = re.compile(  # The second span after "Score:" in the same div
+    rb'<span class="dark_text">Score:</span>\s*<span[^>]*>[^<]*</span>'
+    rb'(?:[^<]|<(?!span\b|/div\b)[^>]*>)*<span[^>]*>([^<]*)</span>'
+)
+
+
+def _get_texts_from_html(html):
+    """Return the same texts as _get_texts_from_soup without building a soup.
+
+    Raises:
+        ParseError: If the page is not UTF-8.
+    """
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+
+    try:
+        texts = {}
+        for match in _fast_label_regex.finditer(html):
+            label = unescape(match.group(1).decode('utf-8'))
+            texts.setdefault(label, unescape(match.group(2).decode('utf-8')).strip() or None)
+
+        name_match = _fast_name_regex.search(html)
+        texts['name'] = name_match and unescape(name_match.group(1).decode('utf-8'))
+
+        if 'Score:' in texts:
+            count_match = _fast_scored_by_regex.search(html)
+            texts['Scored by:'] = count_match and count_match.group(1).decode('utf-8')
+    except UnicodeDecodeError as err:
+        raise ParseError('Unable to decode the page as UTF-8 (%s)' % err)
+
+    return texts
+
+
+# --- Process the Texts ---
+
+
+def _get_name(texts, data=None):
+    text = texts.get('name')
+    if not text:
+        raise MissingTagError('name')
 
-    text = pretag.next_sibling.strip()
     return text
 
 
-def _get_format(soup, data=None):
-    pretag = soup.find('span', string='Type:')
-    if not pretag:
-        raise MissingTagError('type')
+def _get_english_name(texts, data=None):
+    # This is not always present (https://myanimelist.net/anime/15)
+    return texts.get('English:') or ''
+
 
-    for text in itertools.islice(pretag.next_siblings, 3):
-        text = text.string.strip()
-        if text:
-            break
-    else:
-        text = None
+def _get_format(texts, data=None):
+    text = texts.get('Type:')
+    if not text:
+        raise MissingTagError('type')
 
     format_ = Format.mal_to_enum(text)
     if not format_:  # pragma: no cover
@@ -213,12 +534,12 @@ def _get_format(soup, data=None):
     return format_
 
 
-def _get_episodes(soup, data=None):
-    pretag = soup.find('span', string='Episodes:')
-    if not pretag:
+def _get_episodes(texts, data=None):
+    text = texts.get('Episodes:')
+    if not text:
         raise MissingTagError('episodes')
 
-    episodes_text = pretag.next_sibling.strip().lower()
+    episodes_text = text.lower()
     if episodes_text == 'unknown':
         return None
 
@@ -231,12 +552,11 @@ def _get_episodes(soup, data=None):
     return episodes_number
 
 
-def _get_airing_status(soup, data=None):
-    pretag = soup.find('span', string='Status:')
-    if not pretag:
+def _get_airing_status(texts, data=None):
+    status_text = texts.get('Status:')
+    if not status_text:
         raise MissingTagError('status')
 
-    status_text = pretag.next_sibling
     status = AiringStatus.mal_to_enum(status_text)
 
     if not status:  # pragma: no cover
@@ -246,12 +566,12 @@ def _get_airing_status(soup, data=None):
     return status
 
 
-def _get_start_date(soup, data=None):
-    pretag = soup.find('span', string='Aired:')
-    if not pretag:
+def _get_start_date(texts, data=None):
+    text = texts.get('Aired:')
+    if not text:
         raise MissingTagError('aired')
 
-    aired_text = pretag.next_sibling.strip().lower()
+    aired_text = text.lower()
     if aired_text == 'not available':
         return None
 
@@ -266,12 +586,11 @@ def _get_start_date(soup, data=None):
     return start_date
 
 
-def _get_end_date(soup, data=None):
-    pretag = soup.find('span', string='Aired:')
-    if not pretag:
+def _get_end_date(texts, data=None):
+    aired_text = texts.get('Aired:')
+    if not aired_text:
         raise MissingTagError('aired')
 
-    aired_text = pretag.next_sibling.strip()
     date_range_text = aired_text.split(' to ')
 
     # Not all Aired tags have a date range (https://myanimelist.net/anime/5)
@@ -292,9 +611,9 @@ def _get_end_date(soup, data=None):
     return end_date
 
 
-def _get_airing_premiere(soup, data):
-    pretag = soup.find('span', string='Premiered:')
-    if not pretag:
+def _get_airing_premiere(texts, data):
+    text = texts.get('Premiered:')
+    if not text:
         # Film: https://myanimelist.net/anime/5
         # OVA: https://myanimelist.net/anime/44
         # ONA: https://myanimelist.net/anime/574
@@ -308,10 +627,10 @@ def _get_airing_premiere(soup, data):
             raise MissingTagError('premiered')
 
     # '?': https://myanimelist.net/anime/3624
-    if pretag.next_sibling.string.strip() == '?':
+    if text == '?':
         return None
 
-    season, year = pretag.find_next('a').string.lower().split(' ')
+    season, _, year = text.lower().partition(' ')
 
     season = Season.mal_to_enum(season)
     if season is None:
@@ -327,12 +646,11 @@ def _get_airing_premiere(soup, data):
     return (year, season)
 
 
-def _get_mal_age_rating(soup, data=None):
-    pretag = soup.find('span', string='Rating:')
-    if not pretag:
+def _get_mal_age_rating(texts, data=None):
+    full_text = texts.get('Rating:')
+    if not full_text:
         raise MissingTagError('Rating')
 
-    full_text = pretag.next_sibling.strip()
     rating_text = full_text.split('(')[0]
     if not rating_text.startswith('R - 17+'):
         rating_text = rating_text.split(' - ')[0]  # A little hacky for PG-13
@@ -346,12 +664,11 @@ def _get_mal_age_rating(soup, data=None):
     return rating
 
 
-def _get_mal_score(soup, data):
-    pretag = soup.find('span', string='Score:')
-    if not pretag:
+def _get_mal_score(texts, data):
+    rating_text = texts.get('Score:')
+    if not rating_text:
         raise MissingTagError('Score')
 
-    rating_text = pretag.find_next_sibling('span').string.strip()
     # Not aired yet/MAL does not know anime are excluded
     if rating_text == 'N/A':
         return None
@@ -362,24 +679,23 @@ def _get_mal_score(soup, data):
         raise ParseError('Unable to identify rating from "%s"' % rating_text)
 
 
-def _get_mal_scored_by(soup, data=None):
-    pretag = soup.find('span', string='Score:')
-    if not pretag:
+def _get_mal_scored_by(texts, data=None):
+    text = texts.get('Scored by:')
+    if not text:
         raise MissingTagError('Score')
 
-    count_text = pretag.find_next_siblings('span')[1].string.strip().replace(',', '')
+    count_text = text.strip().replace(',', '')
     try:
         return int(count_text)
     except ValueError:
         raise ParseError('Unable to identify #people scoring from "%s"' % count_text)
 
 
-def _get_mal_rank(soup, data):
-    pretag = soup.find('span', string='Ranked:')
-    if not pretag:
+def _get_mal_rank(texts, data):
+    full_text = texts.get('Ranked:')
+    if not full_text:
         raise MissingTagError('Ranked')
 
-    full_text = pretag.next_sibling.strip()
     # Not aired yet and some R+ anime are excluded
     excluded_age_ratings = (
         AgeRating.mal_none, AgeRating.mal_r1, AgeRating.mal_r2, AgeRating.mal_r3
@@ -396,12 +712,11 @@ def _get_mal_rank(soup, data):
         raise ParseError('Unable to identify rank "%s"' % full_text)
 
 
-def _get_mal_popularity(soup, data=None):
-    pretag = soup.find('span', string='Popularity:')
-    if not pretag:
+def _get_mal_popularity(texts, data=None):
+    full_text = texts.get('Popularity:')
+    if not full_text:
         raise MissingTagError('Popularity')
 
-    full_text = pretag.next_sibling.strip()
     number_value = full_text.replace(',', '').replace('#', '')
     try:
         return int(number_value)
@@ -409,12 +724,11 @@ def _get_mal_popularity(soup, data=None):
         raise ParseError('Unable to identify popularity "%s"' % full_text)
 
 
-def _get_mal_members(soup, data=None):
-    pretag = soup.find('span', string='Members:')
-    if not pretag:
+def _get_mal_members(texts, data=None):
+    full_text = texts.get('Members:')
+    if not full_text:
         raise MissingTagError('Members')
 
-    full_text = pretag.next_sibling.strip()
     number_value = full_text.replace(',', '')
     try:
         return int(number_value)
@@ -422,12 +736,11 @@ def _get_mal_members(soup, data=None):
         raise ParseError('Unable to identify #members "%s"' % full_text)
 
 
-def _get_mal_favourites(soup, data=None):
-    pretag = soup.find('span', string='Favorites:')
-    if not pretag:
+def _get_mal_favourites(texts, data=None):
+    full_text = texts.get('Favorites:')
+    if not full_text:
         raise MissingTagError('Favorites')
 
-    full_text = pretag.next_sibling.strip()
     number_value = full_text.replace(',', '')
     try:
         return int(number_value)
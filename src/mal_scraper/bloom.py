@@ -0,0 +1,127 @@
+"""A Bloom filter to remember (approximately) which strings have been seen.
+
+Remembering tens of millions of usernames exactly takes gigabytes, whereas a
+Bloom filter takes about 1.2 bytes per username for a 1% false-positive rate
+(i.e. 1% of new usernames are wrongly thought to have been seen)::
+
+    seen = BloomFilter(capacity=50000000, error_rate=0.01)  # ~60MB
+    seen.add('TheLlama')  # True (it was new)
+    'TheLlama' in seen  # True
+
+The filter can be saved to a file, which is memory-mapped when loaded so that
+starting up does not read it all into memory::
+
+    seen.save('seen_users.bloom')
+    seen = BloomFilter.load('seen_users.bloom')
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+
+_MAGIC = b'MALBLOOM'
+_HEADER = struct.Struct('<8sQQQ')  # magic, num_bits, num_hashes, count
+
+
+class BloomFilter:
+    """Remember strings with a bounded false-positive rate, in constant memory.
+
+    This is not thread-safe.
+
+    Args:
+        capacity (int): The number of strings to size the filter for. The
+            false-positive rate rises above `error_rate` beyond this.
+        error_rate (float, optional): The false-positive rate at capacity.
+
+    Attributes:
+        num_bits (int): The size of the filter.
+        num_hashes (int): The number of bits set for each string.
+        count (int): The number of strings added (excluding those which
+            were, perhaps wrongly, thought to have been seen already).
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError('capacity must be positive and error_rate between 0 and 1')
+
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        self._init(num_bits, num_hashes, 0, bytearray((num_bits + 7) // 8))
+
+    def _init(self, num_bits, num_hashes, count, bits, mapped=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.count = count
+        self._bits = bits
+        self._mapped = mapped
+
+    @classmethod
+    def load(cls, path):
+        """Return the filter saved at the path, memory-mapped (copy-on-write).
+
+        Changes to the loaded filter are not written to the file until it is saved.
+
+        Raises:
+            ValueError: If the file is not a saved filter.
+        """
+        with open(path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            raise ValueError('"%s" is not a saved BloomFilter' % path)
+
+        magic, num_bits, num_hashes, count = _HEADER.unpack_from(mapped)
+        if magic != _MAGIC or len(mapped) != _HEADER.size + (num_bits + 7) // 8:
+            mapped.close()
+            raise ValueError('"%s" is not a saved BloomFilter' % path)
+
+        bloom = cls.__new__(cls)
+        bloom._init(num_bits, num_hashes, count, memoryview(mapped)[_HEADER.size:], mapped)
+        return bloom
+
+    def save(self, path):
+        """Save the filter to a file (which may be the file it was loaded from)."""
+        # Replace rather than overwrite the file, which may be mapped
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, self.num_bits, self.num_hashes, self.count))
+            file.write(self._bits)
+
+        os.replace(temp_path, path)
+
+    def add(self, key):
+        """Add the string, returning whether it was new (False if it was seen)."""
+        bits = self._bits
+        is_new = False
+        for index in self._get_indexes(key):
+            mask = 1 << (index & 7)
+            if not bits[index >> 3] & mask:
+                bits[index >> 3] |= mask
+                is_new = True
+
+        self.count += is_new
+        return is_new
+
+    def close(self):
+        """Release the memory-mapped file (if the filter was loaded)."""
+        if self._mapped is not None:
+            self._bits.release()
+            self._mapped.close()
+            self._mapped = None
+
+    def __contains__(self, key):
+        bits = self._bits
+        return all(bits[index >> 3] & (1 << (index & 7)) for index in self._get_indexes(key))
+
+    def __len__(self):
+        return self.count
+
+    def _get_indexes(self, key):
+        # Derive every index from two hashes (Kirsch & Mitzenmacher)
+        digest = hashlib.sha256(key.encode('utf-8')).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return ((first + i * second) % self.num_bits for i in range(self.num_hashes))
@@ -0,0 +1,460 @@
+"""Cache responses and parsed results so that re-crawling MAL is mostly local.
+
+Wrap a requester with a :class:`CachingRequester`::
+
+    cache = mal_scraper.cache.ResponseCache('mal_cache.sqlite')
+    requester = mal_scraper.cache.CachingRequester(cache)
+
+    mal_scraper.get_anime(1, requester=requester)  # From the network
+    mal_scraper.get_anime(1, requester=requester)  # From the cache
+
+Fresh responses are returned without touching the network (or the rate
+limiter). Stale responses are revalidated with their ETag/Last-Modified so
+that an unchanged page is not downloaded again.
+
+Parsing an unchanged page again can be skipped too with a :class:`ResultCache`::
+
+    results = mal_scraper.cache.ResultCache(DiskResultStore('mal_results.sqlite'))
+    mal_scraper.get_anime(1, requester=requester, result_cache=results)
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import requests
+
+from .requester import default_requester
+
+logger = logging.getLogger(__name__)
+
+# The family of each URL (built by the library) which has its own TTL
+URL_FAMILIES = (
+    ('anime', re.compile(r'^https?://myanimelist\.net/anime/\d+$')),
+    ('profile', re.compile(r'^https?://myanimelist\.net/profile/[^/]+$')),
+    ('anime_list', re.compile(r'^https?://myanimelist\.net/animelist/[^/]+/load\.json')),
+)
+
+# Seconds for which a response is fresh by its URL's family ('other' for any other URL)
+DEFAULT_TTLS = {
+    'anime': 7 * 24 * 60 * 60,
+    'profile': 24 * 60 * 60,
+    'anime_list': 60 * 60,
+    'other': 0,
+}
+
+
+def get_url_family(url):
+    """Return the name of the URL family (see URL_FAMILIES), or 'other'."""
+    for family, regex in URL_FAMILIES:
+        if regex.match(url):
+            return family
+
+    return 'other'
+
+
+class ResponseCache:
+    """Store successful responses in a SQLite database, compressed.
+
+    The least recently used responses are removed when the (compressed)
+    responses take up more than `max_size` bytes. Reads do not write: when
+    responses were last used is kept in memory and written in batches.
+    This is thread-safe.
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+        ttls (dict, optional): {family: seconds} for which responses are fresh,
+            overriding :data:`DEFAULT_TTLS`.
+        max_size (int, optional): The maximum number of bytes to store.
+        compress_level (int, optional): The zlib compression level (0-9).
+    """
+
+    def __init__(self, path=':memory:', ttls=None, max_size=1024 ** 3, compress_level=6):
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_size = max_size
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY, status_code INTEGER, headers TEXT, content BLOB,'
+            ' size INTEGER, stored_at REAL, accessed_at REAL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)'
+        )
+        self._connection.commit()
+        self._size = self._connection.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()[0]
+        self._accesses = _Accesses(self._connection, 'responses', 'url')
+
+    def get(self, url):
+        """Return the CachedResponse for the url (fresh or stale), or None."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT status_code, headers, content, stored_at FROM responses WHERE url = ?',
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._accesses.record(url)
+
+        status_code, headers, content, stored_at = row
+        ttl = self.ttls[get_url_family(url)]
+        return CachedResponse(
+            url, status_code, json.loads(headers), zlib.decompress(content),
+            is_fresh=time.time() - stored_at < ttl,
+        )
+
+    def store(self, url, response):
+        """Store the response (replacing any for the url) and evict if necessary."""
+        content = zlib.compress(response.content, self.compress_level)
+        headers = json.dumps(dict(response.headers))
+        now = time.time()
+
+        with self._lock:
+            self._delete(url)
+            self._connection.execute(
+                'INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, response.status_code, headers, content, len(content), now, now),
+            )
+            self._size += len(content)
+            if self._size > self.max_size:
+                self._evict()
+            self._connection.commit()
+
+    def refresh(self, url):
+        """Make the url's response fresh again (e.g. it was revalidated)."""
+        with self._lock:
+            now = time.time()
+            self._accesses.forget(url)
+            self._connection.execute(
+                'UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?',
+                (now, now, url),
+            )
+            self._connection.commit()
+
+    def delete(self, url):
+        """Remove the url's response."""
+        with self._lock:
+            self._delete(url)
+            self._connection.commit()
+
+    def size(self):
+        """Return the number of bytes stored."""
+        return self._size
+
+    def close(self):
+        """Close the database (writing when responses were last used)."""
+        with self._lock:
+            self._accesses.flush()
+            self._connection.commit()
+        self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    def _delete(self, url):
+        row = self._connection.execute(
+            'SELECT size FROM responses WHERE url = ?', (url,),
+        ).fetchone()
+        if row is not None:
+            self._connection.execute('DELETE FROM responses WHERE url = ?', (url,))
+            self._size -= row[0]
+            self._accesses.forget(url)
+
+    def _evict(self):
+        self._accesses.flush()  # So that we evict by the latest use
+        excess = self._size - self.max_size
+        rows = self._connection.execute('SELECT url, size FROM responses ORDER BY accessed_at')
+        evicted = []
+        for url, size in rows:
+            if excess <= 0:
+                break
+            evicted.append((url,))
+            excess -= size
+            self._size -= size
+
+        logger.debug('Evicting %d responses from the cache', len(evicted))
+        self._connection.executemany('DELETE FROM responses WHERE url = ?', evicted)
+
+
+class CachedResponse:
+    """A response from the cache.
+
+    Attributes:
+        url (str): The URL of the response.
+        status_code (int): The HTTP status of the response.
+        headers (dict): The HTTP headers of the response.
+        content (bytes): The body of the response.
+        is_fresh (bool): Whether the response is within its TTL.
+    """
+
+    def __init__(self, url, status_code, headers, content, is_fresh):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.is_fresh = is_fresh
+
+    def get_validators(self):
+        """Return the headers to revalidate this response (may be empty)."""
+        headers = requests.structures.CaseInsensitiveDict(self.headers)
+        validators = {}
+        if 'ETag' in headers:
+            validators['If-None-Match'] = headers['ETag']
+        if 'Last-Modified' in headers:
+            validators['If-Modified-Since'] = headers['Last-Modified']
+
+        return validators
+
+    def to_response(self):
+        """Return a `requests.Response` with `from_cache` set to True."""
+        response = requests.Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        response.reason = 'OK'
+        response._content = self.content
+        response.from_cache = True
+        return response
+
+
+class CachingRequester:
+    """Make requests through a :class:`ResponseCache` (thread-safe).
+
+    Args:
+        cache (ResponseCache): Where to keep the responses.
+        requester (requests-like, optional): HTTP request maker for cache
+            misses and revalidation.
+    """
+
+    def __init__(self, cache, requester=default_requester):
+        self.cache = cache
+        self.requester = requester
+
+    def get(self, url, **kwargs):
+        """Make a GET request (see `requests.get`), using the cache if possible."""
+        cached = self.cache.get(url)
+        if cached is not None and cached.is_fresh:
+            logger.debug('Using the cached response for "%s"', url)
+            return cached.to_response()
+
+        if cached is not None:
+            kwargs['headers'] = dict(cached.get_validators(), **kwargs.get('headers', {}))
+
+        response = self.requester.get(url, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            logger.debug('The cached response for "%s" is still valid', url)
+            self.cache.refresh(url)
+            return cached.to_response()
+
+        if response.status_code == 200:
+            self.cache.store(url, response)
+
+        response.from_cache = False
+        return response
+
+
+class ResultCache:
+    """Memoize the data parsed from pages by a hash of their content.
+
+    The hash includes the kind of page and the version of its parser (e.g.
+    :data:`mal_scraper.anime.PARSER_VERSION`) so that the results are
+    invalidated whenever the parser changes.
+
+    Args:
+        store (optional): Where to keep the results, e.g. a
+            :class:`MemoryResultStore` (the default) or :class:`DiskResultStore`.
+    """
+
+    def __init__(self, store=None):
+        self.store = MemoryResultStore() if store is None else store
+
+    def bind(self, kind, version):
+        """Return a :class:`BoundResultCache` for the kind of page and its parser version."""
+        return BoundResultCache(self, kind, version)
+
+    def get(self, kind, version, content):
+        """Return the data for the page's content, or None if it is not cached."""
+        data = self.store.get(self.make_key(kind, version, content))
+        # Pickled so that the caller cannot modify what we keep
+        return None if data is None else pickle.loads(data)
+
+    def put(self, kind, version, content, data):
+        """Store the data parsed from the page's content."""
+        self.store.put(self.make_key(kind, version, content), pickle.dumps(data))
+
+    @staticmethod
+    def make_key(kind, version, content):
+        """Return the key (str) of the page's content."""
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        prefix = '{}\0{}\0'.format(kind, version).encode('utf-8')
+        return hashlib.sha256(prefix + content).hexdigest()
+
+
+class BoundResultCache:
+    """A :class:`ResultCache` for one kind of page and its parser version."""
+
+    def __init__(self, cache, kind, version):
+        self.cache = cache
+        self.kind = kind
+        self.version = version
+
+    def get(self, content):
+        """Return the data for the page's content, or None if it is not cached."""
+        return self.cache.get(self.kind, self.version, content)
+
+    def put(self, content, data):
+        """Store the data parsed from the page's content."""
+        self.cache.put(self.kind, self.version, content, data)
+
+
+class MemoryResultStore:
+    """Keep the most recently used results in memory (thread-safe).
+
+    Args:
+        max_entries (int, optional): The number of results to keep.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DiskResultStore:
+    """Keep the most recently used results in a SQLite database (thread-safe).
+
+    Reads do not write: when results were last used is kept in memory and
+    written in batches. Going over `max_entries` evicts a batch of the
+    least recently used results (`evict_fraction` of `max_entries`) at once.
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+        max_entries (int, optional): The number of results to keep.
+        evict_fraction (float, optional): The fraction of `max_entries` to
+            evict beyond the excess.
+    """
+
+    def __init__(self, path=':memory:', max_entries=1000000, evict_fraction=0.05):
+        self.max_entries = max_entries
+        self.evict_fraction = evict_fraction
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data BLOB, accessed_at REAL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at)'
+        )
+        self._connection.commit()
+        self._count = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        self._accesses = _Accesses(self._connection, 'results', 'key')
+
+    def get(self, key):
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT data FROM results WHERE key = ?', (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._accesses.record(key)
+            return row[0]
+
+    def put(self, key, data):
+        with self._lock:
+            inserted = self._connection.execute(
+                'INSERT OR IGNORE INTO results VALUES (?, ?, ?)', (key, data, time.time()),
+            ).rowcount
+            if inserted:
+                self._count += 1
+            else:
+                self._connection.execute(
+                    'UPDATE results SET data = ?, accessed_at = ? WHERE key = ?',
+                    (data, time.time(), key),
+                )
+
+            if self._count > self.max_entries:
+                self._evict()
+            self._connection.commit()
+
+    def close(self):
+        """Close the database (writing when results were last used)."""
+        with self._lock:
+            self._accesses.flush()
+            self._connection.commit()
+        self._connection.close()
+
+    def __len__(self):
+        return self._count
+
+    def _evict(self):
+        self._accesses.flush()  # So that we evict by the latest use
+        excess = self._count - self.max_entries + int(self.max_entries * self.evict_fraction)
+        logger.debug('Evicting %d results from the cache', excess)
+        self._count -= self._connection.execute(
+            'DELETE FROM results WHERE key IN ('
+            ' SELECT key FROM results ORDER BY accessed_at LIMIT ?)',
+            (excess,),
+        ).rowcount
+
+
+class _Accesses:
+    """Record when rows were last used, writing them to the table in batches.
+
+    This is not thread-safe (the owner holds its lock). The writes are
+    committed with the owner's next commit.
+    """
+
+    def __init__(self, connection, table, key_column, batch_size=256):
+        self.batch_size = batch_size
+        self._connection = connection
+        self._update = 'UPDATE {} SET accessed_at = ? WHERE {} = ?'.format(table, key_column)
+        self._accessed = {}  # key: time.time()
+
+    def record(self, key):
+        self._accessed[key] = time.time()
+        if len(self._accessed) >= self.batch_size:
+            self.flush()
+            self._connection.commit()
+
+    def forget(self, key):
+        self._accessed.pop(key, None)
+
+    def flush(self):
+        self._connection.executemany(
+            self._update, ((when, key) for key, when in self._accessed.items()),
+        )
+        self._accessed.clear()
@@ -0,0 +1,181 @@
+"""Store anime list entries column by column in typed arrays.
+
+A dict per anime list entry costs hundreds of bytes, whereas the typed
+columns of :class:`AnimeListColumns` cost 15 bytes per entry. The columns
+can be viewed (without copying) as NumPy arrays or an Arrow table for
+vectorised analysis::
+
+    columns = AnimeListColumns()
+    for user_id in user_ids:
+        columns.append_user_anime_list(user_id)
+
+    scores = columns.to_numpy()['score']
+    scores[scores > 0].mean()
+
+NumPy (``pip install numpy``) and Arrow (``pip install pyarrow``) are only
+needed for the exports.
+"""
+
+from array import array
+from collections import namedtuple
+from functools import partial
+
+from .consts import ConsumptionStatus
+from .requester import default_requester
+from .users import (
+    _get_anime_list_page, _iter_anime_list_pages, default_anime_list_limiter,
+)
+
+# The MAL code of each ConsumptionStatus (0 is unknown)
+STATUS_CODES = {
+    ConsumptionStatus.mal_code_to_enum(code): code
+    for code in range(1, 7) if ConsumptionStatus.mal_code_to_enum(code)
+}
+
+# The array typecode of each column
+COLUMNS = (
+    ('user_index', 'i'),  # Index into AnimeListColumns.user_ids
+    ('id_ref', 'i'),
+    ('consumption_status', 'b'),  # See STATUS_CODES
+    ('score', 'b'),
+    ('progress', 'i'),
+    ('is_rewatch', 'b'),
+)
+
+AnimeListRow = namedtuple('AnimeListRow', [
+    'user_id', 'id_ref', 'consumption_status', 'score', 'progress', 'is_rewatch',
+])
+
+
+class AnimeListColumns:
+    """The anime list entries of many users in typed columns.
+
+    Attributes:
+        user_ids (list of str): The users, indexed by the user_index column.
+        columns (dict): {name: array.array} for each name in :data:`COLUMNS`.
+    """
+
+    def __init__(self):
+        self.user_ids = []
+        self._user_indexes = {}
+        self.columns = {name: array(typecode) for name, typecode in COLUMNS}
+
+    def append(self, user_id, anime):
+        """Append an anime-info dict (or record) from :func:`mal_scraper.get_user_anime_list`."""
+        self._append_row(
+            self._get_user_index(user_id),
+            anime['id_ref'],
+            STATUS_CODES.get(anime['consumption_status'], 0),
+            anime['score'],
+            anime['progress'],
+            anime['is_rewatch'],
+        )
+
+    def append_json(self, user_id, json):
+        """Append a page of a user's anime list as decoded from MAL's JSON.
+
+        This skips building a dict per anime, see
+        :func:`mal_scraper.users.get_user_anime_list_from_json`.
+        """
+        user_index = self._get_user_index(user_id)
+        for mal_anime in json:
+            status = int(mal_anime['status'])
+            self._append_row(
+                user_index,
+                int(mal_anime['anime_id']),
+                status if ConsumptionStatus.mal_code_to_enum(status) else 0,
+                int(mal_anime['score']),
+                int(mal_anime['num_watched_episodes']),
+                bool(mal_anime['is_rewatching']),
+            )
+
+    def append_user_anime_list(self, user_id, requester=default_requester, concurrency=1,
+                               limiter=default_anime_list_limiter):
+        """Retrieve and append a user's anime list, see :func:`mal_scraper.get_user_anime_list`.
+
+        Returns:
+            The number of anime appended.
+        """
+        get_page = partial(
+            _get_anime_list_page, user_id, requester, limiter, from_json=_identity,
+        )
+
+        length = len(self)
+        for json in _iter_anime_list_pages(get_page, concurrency):
+            self.append_json(user_id, json)
+
+        return len(self) - length
+
+    def __len__(self):
+        return len(self.columns['id_ref'])
+
+    def __getitem__(self, index):
+        """Return the AnimeListRow at the index (with the user_id and ConsumptionStatus)."""
+        user_index, id_ref, status, score, progress, is_rewatch = (
+            self.columns[name][index] for name, typecode in COLUMNS
+        )
+        return AnimeListRow(
+            self.user_ids[user_index], id_ref, ConsumptionStatus.mal_code_to_enum(status),
+            score, progress, bool(is_rewatch),
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_numpy(self):
+        """Return {name: numpy.ndarray} views of the columns (without copying).
+
+        The columns cannot be appended to while the views exist (BufferError).
+        """
+        import numpy
+
+        return {
+            name: numpy.frombuffer(self.columns[name], dtype=typecode)
+            for name, typecode in COLUMNS
+        }
+
+    def to_arrow(self):
+        """Return a `pyarrow.Table` of the columns (without copying the columns).
+
+        The user_index column becomes a dictionary-encoded user_id column.
+        The columns cannot be appended to while the table exists (BufferError).
+        """
+        import pyarrow
+
+        types = {'i': pyarrow.int32(), 'b': pyarrow.int8()}
+        arrays = {
+            name: pyarrow.Array.from_buffers(
+                types[typecode], len(self), [None, pyarrow.py_buffer(self.columns[name])],
+            )
+            for name, typecode in COLUMNS
+        }
+        arrays['user_id'] = pyarrow.DictionaryArray.from_arrays(
+            arrays.pop('user_index'), pyarrow.array(self.user_ids, pyarrow.string()),
+        )
+
+        names = ['user_id'] + [name for name, typecode in COLUMNS[1:]]
+        return pyarrow.Table.from_arrays([arrays[name] for name in names], names)
+
+    def _get_user_index(self, user_id):
+        if user_id not in self._user_indexes:
+            self._user_indexes[user_id] = len(self.user_ids)
+            self.user_ids.append(user_id)
+
+        return self._user_indexes[user_id]
+
+    def _append_row(self, *row):
+        """Append a value to every column, or to none (e.g. on OverflowError)."""
+        appended = []
+        try:
+            for (name, typecode), value in zip(COLUMNS, row):
+                self.columns[name].append(value)
+                appended.append(name)
+        except Exception:
+            for name in appended:  # Keep the columns aligned
+                self.columns[name].pop()
+            raise
+
+
+def _identity(json):
+    return json
@@ -0,0 +1,250 @@
+"""Run library calls concurrently with bounded memory."""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+
+import requests
+
+from .exceptions import MalScraperError
+from .parsing import get_response_encoding
+
+# Errors which are given back for an individual page rather than raised
+ITEM_ERRORS = (MalScraperError, requests.RequestException)
+
+
+def retrieve_many(keys, fetch, parse, concurrency, ordered=True, processes=None, chunksize=1,
+                  memo=None):
+    """Generate (key, response, data, error) for many web-pages retrieved concurrently.
+
+    Fetching (I/O) is done on a pool of threads. Parsing is done on the same
+    threads, or in a pool of processes to use every core (BeautifulSoup holds
+    the GIL).
+
+    Args:
+        keys (iterable): The identifier of each web-page, consumed lazily.
+        fetch (callable): fetch(key) returns the response (raising if it is bad).
+        parse (callable): parse(response.content, from_encoding=...) returns
+            the data, where from_encoding is the one declared for the web-page.
+            This must be picklable for processes, i.e. a module-level function
+            or a partial of one.
+        concurrency (int): The number of threads fetching web-pages.
+        ordered (bool, optional): Generate in the order of the keys (True), or
+            as soon as each web-page is done (False).
+        processes (int, optional): The number of processes to parse in, or None
+            to parse on the fetching threads.
+        chunksize (int, optional): The number of web-pages to send to a process
+            at once, which amortises the cost of communication.
+        memo (optional): Skip parsing if `memo.get(content)` returns the data,
+            otherwise `memo.put(content, data)`, e.g. a
+            :class:`mal_scraper.cache.BoundResultCache`.
+
+    Yields:
+        (key, response, data, error): The error is None if the web-page was
+        retrieved, otherwise the response and/or data are None.
+
+    Raises:
+        Any error which is not from this library or the Requests library.
+    """
+    if processes:
+        results = _retrieve_in_processes(
+            keys, fetch, parse, concurrency, ordered, processes, chunksize, memo,
+        )
+    else:
+        results = _retrieve_in_threads(keys, fetch, parse, concurrency, ordered, memo)
+
+    for key, response, data, error in results:
+        if error is not None and not isinstance(error, ITEM_ERRORS):
+            raise error
+
+        yield key, response, data, error
+
+
+def _retrieve_in_threads(keys, fetch, parse, concurrency, ordered, memo):
+    def retrieve(key):
+        response = fetch(key)
+        encoding = get_response_encoding(response)
+        return response, parse_with_memo(parse, memo, response.content, encoding)
+
+    for key, future in map_concurrently(retrieve, keys, concurrency, ordered):
+        error = future.exception()
+        if error is None:
+            response, data = future.result()
+            yield key, response, data, None
+        else:
+            yield key, None, None, error
+
+
+def _retrieve_in_processes(keys, fetch, parse, concurrency, ordered, processes, chunksize,
+                           memo):
+    fetched = map_concurrently(fetch, keys, concurrency, ordered)
+    pages = (_get_page_to_parse(key, future, memo) for key, future in fetched)
+    parse_page = partial(_call_with_page, parse)
+
+    for (key, future, memo_data), data, error in map_in_processes(
+            parse_page, pages, processes, chunksize, ordered):
+        fetch_error = future.exception()
+        if fetch_error is not None:
+            yield key, None, None, fetch_error
+        elif memo_data is not None:
+            yield key, future.result(), memo_data, None
+        else:
+            if memo is not None and error is None:
+                memo.put(future.result().content, data)
+            yield key, future.result(), data, error
+
+
+def _get_page_to_parse(key, future, memo):
+    """Return ((key, future, memo_data), page) where page is None to not parse.
+
+    The page is (content, from_encoding).
+    """
+    if future.exception() is not None:
+        return (key, future, None), None
+
+    response = future.result()
+    memo_data = None if memo is None else memo.get(response.content)
+    if memo_data is not None:
+        return (key, future, memo_data), None
+
+    return (key, future, None), (response.content, get_response_encoding(response))
+
+
+def _call_with_page(func, page):
+    if page is None:
+        return None
+
+    content, from_encoding = page
+    return func(content, from_encoding=from_encoding)
+
+
+def parse_with_memo(parse, memo, content, from_encoding=None):
+    """Return parse(content, from_encoding=...) unless the memo (which may be None) has it."""
+    if memo is None:
+        return parse(content, from_encoding=from_encoding)
+
+    data = memo.get(content)
+    if data is None:
+        data = parse(content, from_encoding=from_encoding)
+        memo.put(content, data)
+
+    return data
+
+
+def map_in_processes(func, pairs, processes, chunksize=1, ordered=True):
+    """Generate (key, result, error) for func(arg) of (key, arg) pairs called in processes.
+
+    Only the args are sent to the processes, in chunks of `chunksize` to
+    amortise the cost of communication, while the keys stay with us. The
+    results and errors must be picklable.
+
+    Args:
+        func (callable): Called with each arg. Must be picklable, i.e. a
+            module-level function or a partial of one.
+        pairs (iterable): The (key, arg) pairs, consumed lazily.
+        processes (int): The number of processes.
+        chunksize (int, optional): The number of args to send at once.
+        ordered (bool, optional): Generate in the order of the pairs (True),
+            or as soon as each chunk completes (False).
+
+    Yields:
+        (key, result, error): The error is None if func returned the result.
+    """
+    call_for_each = partial(_call_for_each, func)
+
+    with ProcessPoolExecutor(processes) as executor:
+        def call_in_process(chunk):
+            return executor.submit(call_for_each, [arg for key, arg in chunk]).result()
+
+        # Keep every process busy while the previous results are sent back
+        chunks = _chunked(pairs, chunksize)
+        for chunk, future in map_concurrently(call_in_process, chunks, processes * 2, ordered):
+            for (key, arg), (result, error) in zip(chunk, future.result()):
+                yield key, result, error
+
+
+def _call_for_each(func, args):
+    results = []
+    for arg in args:
+        try:
+            results.append((func(arg), None))
+        except Exception as err:
+            results.append((None, err))
+
+    return results
+
+
+def _chunked(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def map_concurrently(func, items, concurrency, ordered=True, executor=None):
+    """Generate (item, future) pairs for func(item) called on a pool of threads.
+
+    Only `concurrency` items are submitted at a time so that an enormous (or
+    endless) iterable of items is processed with flat memory.
+
+    Args:
+        func (callable): Called with each item.
+        items (iterable): The items, consumed lazily.
+        concurrency (int): The maximum number of calls in flight.
+        ordered (bool, optional): Generate in the order of the items (True),
+            or as soon as each call completes (False).
+        executor (concurrent.futures.Executor, optional): Where to call func,
+            defaults to a new pool of `concurrency` threads.
+
+    Yields:
+        (item, concurrent.futures.Future): The future is done, so use
+        `future.result()` or `future.exception()`.
+    """
+    if concurrency < 1:
+        raise ValueError('concurrency must be at least 1 (not %r)' % concurrency)
+
+    if executor is None:
+        with ThreadPoolExecutor(concurrency) as executor:
+            yield from _map_concurrently(func, items, concurrency, ordered, executor)
+    else:
+        yield from _map_concurrently(func, items, concurrency, ordered, executor)
+
+
+def _map_concurrently(func, items, concurrency, ordered, executor):
+    items = iter(items)
+    futures = {}  # future: item
+    pending = deque()  # futures in the order of their items
+
+    def submit_upto_concurrency():
+        while len(pending) < concurrency:
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+
+            future = executor.submit(func, item)
+            futures[future] = item
+            pending.append(future)
+
+    submit_upto_concurrency()
+    while pending:
+        future = _pop_completed(pending, ordered)
+        yield futures.pop(future), future
+        submit_upto_concurrency()
+
+
+def _pop_completed(pending, ordered):
+    """Return the first future (ordered) or any future to complete, removing it."""
+    if ordered:
+        future = pending.popleft()
+        wait([future])
+    else:
+        future = next(iter(wait(pending, return_when=FIRST_COMPLETED).done))
+        pending.remove(future)
+
+    return future
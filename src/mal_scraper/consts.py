@@ -13,6 +13,8 @@ Retrieved = namedtuple('Retrieved', ['meta', 'data'])
         {
             'id_ref': (object) ID of the media depending on the context,
             'when': (datetime) Our best guess on the date of this information,
+            'response': (requests.Response or ResponseSummary) unless the
+                meta_policy is 'none', see :mod:`mal_scraper.meta`,
         }
 
 .. py:attribute:: data
@@ -20,6 +22,48 @@ Retrieved = namedtuple('Retrieved', ['meta', 'data'])
     A dict of data varying on the media.
 """
 
+Failed = namedtuple('Failed', ['meta', 'error'])
+"""When failing to retrieve from a web-page (in bulk, instead of raising)
+
+.. py:attribute:: meta
+
+    A dict of metadata like :class:`.Retrieved`, e.g. with the 'id_ref'.
+
+.. py:attribute:: error
+
+    The exception, e.g. :class:`.RequestError` or :class:`.ParseError`.
+"""
+
+ResponseSummary = namedtuple('ResponseSummary', [
+    'url', 'status_code', 'elapsed', 'content_length', 'content_hash', 'from_cache',
+])
+"""What is kept of a response in `meta['response']` with meta_policy='summary'
+
+.. py:attribute:: url
+
+    The (final) URL of the web-page.
+
+.. py:attribute:: status_code
+
+    The HTTP status (int).
+
+.. py:attribute:: elapsed
+
+    How long the request took (datetime.timedelta).
+
+.. py:attribute:: content_length
+
+    The number of bytes of the content.
+
+.. py:attribute:: content_hash
+
+    The SHA-256 hex digest of the content.
+
+.. py:attribute:: from_cache
+
+    Whether the response came from a :class:`mal_scraper.cache.CachingRequester`.
+"""
+
 
 @unique
 class ConsumptionStatus(Enum):
@@ -0,0 +1,185 @@
+"""Discover users by crawling the graph of users breadth-first.
+
+:func:`mal_scraper.discover_users` only finds recently active users. Instead,
+start from some users and follow the users linked from their profiles (their
+friends, the users who commented on them, etc.)::
+
+    state = mal_scraper.crawler.UserCrawlState('user_crawl.sqlite')
+    requester = mal_scraper.requester.SessionRequester(
+        limiter=mal_scraper.ratelimit.RateLimiter(rate=0.5),
+    )
+
+    results = mal_scraper.crawler.crawl_users(
+        ['Xinil'], state, max_depth=3, max_users=100000, requester=requester,
+    )
+    for result in results:
+        if isinstance(result, mal_scraper.Retrieved):
+            mycode.save_user(result.meta['user_id'], result.data)
+
+The frontier (the users waiting to be retrieved, the nearest first) and the
+users seen so far are kept in a SQLite table, which is the checkpoint: after
+a crash (or to continue past the budget) call :func:`crawl_users` again with
+the same state and the crawl resumes where it stopped.
+
+The rate of requests is limited by the requester's limiter (see
+:mod:`mal_scraper.ratelimit`).
+"""
+
+import logging
+import sqlite3
+import threading
+
+from .consts import Failed
+from .requester import default_requester
+from .user_discovery import discover_users_from_html
+from .users import get_profile_url_for_user, get_user_stats_many
+
+logger = logging.getLogger(__name__)
+
+
+class UserCrawlState:
+    """The frontier and seen users of a crawl, kept in a SQLite database (thread-safe).
+
+    Every user is 'queued', 'done' or 'failed', along with their depth (the
+    number of links from the seed users).
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+    """
+
+    def __init__(self, path=':memory:'):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS users ('
+            ' user_id TEXT PRIMARY KEY, depth INTEGER, status TEXT)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS users_status_depth ON users (status, depth)'
+        )
+        self._connection.commit()
+
+    def add(self, user_ids, depth):
+        """Queue the users which were never seen, returning how many were new."""
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO users VALUES (?, ?, 'queued')",
+                ((user_id, depth) for user_id in user_ids),
+            )
+            self._connection.commit()
+            return self._connection.total_changes - before
+
+    def get_queued(self, limit):
+        """Return the list of (user_id, depth) of the next queued users (nearest first)."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT user_id, depth FROM users WHERE status = 'queued'"
+                ' ORDER BY depth, rowid LIMIT ?',
+                (limit,),
+            ).fetchall()
+
+    def record(self, user_id, status):
+        """Set the status ('done' or 'failed') of the user."""
+        with self._lock:
+            self._connection.execute(
+                'UPDATE users SET status = ? WHERE user_id = ?', (status, user_id),
+            )
+            self._connection.commit()
+
+    def count(self, *statuses):
+        """Return the number of users with any of the statuses (or any status)."""
+        query = 'SELECT COUNT(*) FROM users'
+        if statuses:
+            query += ' WHERE status IN (%s)' % ', '.join('?' * len(statuses))
+
+        with self._lock:
+            return self._connection.execute(query, statuses).fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+
+def crawl_users(seeds, state=None, max_depth=2, max_users=None, concurrency=4,
+                requester=default_requester, **kwargs):
+    """Generate the results of retrieving users breadth-first from the seed users.
+
+    Each user's profile is retrieved with :func:`mal_scraper.get_user_stats_many`
+    and the users linked from it are queued (one deeper), unless they were
+    seen before.
+
+    Args:
+        seeds (iterable of str): The user_ids to start from (at depth 0),
+            which are ignored if they were seen before.
+        state (UserCrawlState, optional): The checkpoint to resume from and
+            update, defaults to a new one in memory.
+        max_depth (int, optional): Do not queue users further than this from
+            the seeds.
+        max_users (int, optional): Stop once this many users were retrieved
+            in total (including by earlier runs with the state), or None to
+            crawl until the frontier is empty.
+        concurrency (int, optional): The number of users to retrieve at once.
+        requester (requests-like, optional): HTTP request maker, which must be
+            thread-safe. Limit the rate of requests with its limiter.
+        kwargs: Passed on to :func:`mal_scraper.get_user_stats_many` (e.g. parser).
+
+    Yields:
+        :class:`.Retrieved` or :class:`.Failed` as :func:`mal_scraper.get_user_stats_many`.
+    """
+    state = UserCrawlState() if state is None else state
+    state.add(seeds, 0)
+    harvester = _HarvestingRequester(requester)
+
+    while True:
+        remaining = _get_remaining(state, max_users)
+        queued = dict(state.get_queued(min(remaining, concurrency * 4)))
+        if not queued:
+            return
+
+        results = get_user_stats_many(
+            queued, concurrency, ordered=False, requester=harvester, **kwargs
+        )
+        for result in results:
+            user_id = result.meta['user_id']
+            linked_users = harvester.pop(get_profile_url_for_user(user_id))
+            if isinstance(result, Failed):
+                state.record(user_id, 'failed')
+            else:
+                depth = queued[user_id] + 1
+                if depth <= max_depth:
+                    state.add(linked_users, depth)
+                state.record(user_id, 'done')
+
+            yield result
+
+
+def _get_remaining(state, max_users):
+    """Return the number of users which may still be retrieved."""
+    if max_users is None:
+        return state.count('queued')
+
+    return max(0, max_users - state.count('done', 'failed'))
+
+
+class _HarvestingRequester:
+    """Keep the users linked from each web-page as it is retrieved (thread-safe)."""
+
+    def __init__(self, requester):
+        self.requester = requester
+        self._linked_users = {}  # url: set of user_ids
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        response = self.requester.get(url, **kwargs)
+        if response.status_code == 200:
+            linked_users = set(discover_users_from_html(response.content, unique=True))
+            with self._lock:
+                self._linked_users[url] = linked_users
+
+        return response
+
+    def pop(self, url):
+        """Return the users linked from the web-page (retrieved from the url), forgetting them."""
+        with self._lock:
+            return self._linked_users.pop(url, set())
@@ -35,6 +35,10 @@ class RequestError(MalScraperError):
         self.code = code
         self.message = message
 
+    def __reduce__(self):
+        # Pickle (e.g. for multiprocessing) with both arguments, not just self.args
+        return (self.__class__, (self.code, self.message))
+
 
 class ParseError(MalScraperError):
     """A component of the HTML could not be parsed/processed.
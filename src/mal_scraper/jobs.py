@@ -0,0 +1,280 @@
+"""Run long crawls which survive crashes, from a persistent queue of work.
+
+Add the items (e.g. every id_ref) to a :class:`JobQueue` once, then run the
+job; run it again after a crash (or Ctrl-C) and it carries on exactly where
+it stopped::
+
+    queue = mal_scraper.jobs.JobQueue('anime_crawl.sqlite')
+    queue.add(range(1, 40000))
+
+    for result in mal_scraper.jobs.run_job(queue, mal_scraper.get_anime):
+        if isinstance(result, mal_scraper.Retrieved):
+            mycode.save_data(result.data)
+
+Every item is 'pending', 'in_flight', 'done' or 'failed'. An item is only
+marked as done once the loop body has handled its result (i.e. when the next
+result is asked for), so no result is lost and no finished item is retrieved
+again. Only the items in flight when the run stopped are retrieved again: at
+most `concurrency` of them (those being retrieved and the one being handled).
+Items which fail are retried with exponential backoff, except when they do
+not exist or are forbidden (see :class:`.RequestError`).
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from .concurrency import ITEM_ERRORS, map_concurrently
+from .consts import Failed
+from .exceptions import ParseError, RequestError
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ('pending', 'in_flight', 'done', 'failed')
+
+JobItem = namedtuple('JobItem', [
+    'key', 'state', 'attempts', 'next_attempt', 'error_code', 'error_tag', 'error_message',
+])
+JobItem.__doc__ = """The state of an item of a job.
+
+Attributes:
+    key: The item (e.g. an id_ref or user_id).
+    state (str): One of JOB_STATES.
+    attempts (int): The number of times it failed.
+    next_attempt (float): When (time.time()) it may be retried.
+    error_code (RequestError.Code or None): The code of the last RequestError.
+    error_tag (str or None): The tag of the last ParseError.
+    error_message (str or None): The last error.
+"""
+
+
+class JobQueue:
+    """The items of a job and their states, kept in a SQLite database (thread-safe).
+
+    Keys are stored as JSON, so they must be JSON-serialisable (e.g. an int
+    or str).
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+    """
+
+    def __init__(self, path=':memory:'):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS items ('
+            ' key TEXT PRIMARY KEY, state TEXT, attempts INTEGER, next_attempt REAL,'
+            ' error_code TEXT, error_tag TEXT, error_message TEXT)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS items_state_next_attempt ON items (state, next_attempt)'
+        )
+        self._connection.commit()
+
+    def add(self, keys):
+        """Add the keys which are not in the queue as pending, returning how many were new."""
+        with self._lock:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO items VALUES (?, 'pending', 0, 0, NULL, NULL, NULL)",
+                ((json.dumps(key),) for key in keys),
+            )
+            self._connection.commit()
+            return self._connection.total_changes - before
+
+    def claim(self, limit, now=None):
+        """Return a list of up to `limit` pending keys which are due, marking them in flight."""
+        now = time.time() if now is None else now
+        with self._lock:
+            keys = [row[0] for row in self._connection.execute(
+                "SELECT key FROM items WHERE state = 'pending' AND next_attempt <= ?"
+                ' ORDER BY next_attempt, rowid LIMIT ?',
+                (now, limit),
+            )]
+            self._set_state(keys, 'in_flight')
+            self._connection.commit()
+
+        return [json.loads(key) for key in keys]
+
+    def complete(self, key):
+        """Mark the key as done."""
+        with self._lock:
+            self._set_state([json.dumps(key)], 'done')
+            self._connection.commit()
+
+    def fail(self, key, error, retry_at=None):
+        """Record the error for the key, which is pending until `retry_at` or failed if None."""
+        code = error.code.value if isinstance(error, RequestError) else None
+        tag = error.tag if isinstance(error, ParseError) else None
+        with self._lock:
+            self._connection.execute(
+                'UPDATE items SET state = ?, attempts = attempts + 1, next_attempt = ?,'
+                ' error_code = ?, error_tag = ?, error_message = ? WHERE key = ?',
+                ('failed' if retry_at is None else 'pending', retry_at or 0,
+                 code, tag, str(error), json.dumps(key)),
+            )
+            self._connection.commit()
+
+    def recover(self):
+        """Make the items which were in flight (e.g. when we crashed) pending again."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE items SET state = 'pending' WHERE state = 'in_flight'"
+            )
+            self._connection.commit()
+
+    def retry_failed(self):
+        """Make the failed items pending again (with their attempts reset)."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE items SET state = 'pending', attempts = 0, next_attempt = 0"
+                " WHERE state = 'failed'"
+            )
+            self._connection.commit()
+
+    def get(self, key):
+        """Return the :class:`JobItem` of the key, or None if it is not in the queue."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT * FROM items WHERE key = ?', (json.dumps(key),),
+            ).fetchone()
+
+        return None if row is None else _make_item(row)
+
+    def get_next_attempt(self):
+        """Return when (time.time()) the next pending item is due, or None if there are none."""
+        with self._lock:
+            return self._connection.execute(
+                "SELECT MIN(next_attempt) FROM items WHERE state = 'pending'"
+            ).fetchone()[0]
+
+    def count(self, *states):
+        """Return the number of items in any of the states (or any state)."""
+        query = 'SELECT COUNT(*) FROM items'
+        if states:
+            query += ' WHERE state IN (%s)' % ', '.join('?' * len(states))
+
+        with self._lock:
+            return self._connection.execute(query, states).fetchone()[0]
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def _set_state(self, keys, state):
+        self._connection.executemany(
+            'UPDATE items SET state = ? WHERE key = ?', ((state, key) for key in keys),
+        )
+
+
+class RetryPolicy:
+    """When to retry the items which fail.
+
+    Args:
+        max_attempts (int, optional): Give up on an item after this many failures.
+        backoff (float, optional): Wait backoff * 2^(failures - 1) seconds
+            before retrying.
+        max_backoff (float, optional): The longest to wait before retrying.
+    """
+
+    def __init__(self, max_attempts=3, backoff=60, max_backoff=6 * 60 * 60):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def get_retry_at(self, error, attempts, now):
+        """Return when (time.time()) to retry after the error, or None to give up.
+
+        Args:
+            error (Exception): The error of the last attempt.
+            attempts (int): The number of failures, including this one.
+            now (float): The time.time() of the failure.
+        """
+        if isinstance(error, RequestError) or attempts >= self.max_attempts:
+            return None  # The item does not exist or is forbidden
+
+        return now + min(self.backoff * 2 ** (attempts - 1), self.max_backoff)
+
+
+def run_job(queue, fetch, concurrency=4, policy=None, wait=True):
+    """Generate the result of fetching every pending item of the queue.
+
+    The items which were in flight when a previous run stopped (at most its
+    `concurrency`) are retrieved again first.
+
+    Args:
+        queue (JobQueue): The items to retrieve.
+        fetch (callable): fetch(key) returns the result for an item, e.g.
+            :func:`mal_scraper.get_anime` or a partial of it.
+        concurrency (int, optional): The number of items to retrieve at once.
+        policy (RetryPolicy, optional): When to retry items which fail.
+        wait (bool, optional): Sleep until items which are backing off are
+            due (True), or stop when none are due (False).
+
+    Yields:
+        The result of fetch(key), or :class:`.Failed` (with the key and the
+        number of attempts in its meta) for an item which was given up on.
+
+    Raises:
+        Any error which is not from this library or the Requests library.
+    """
+    policy = RetryPolicy() if policy is None else policy
+    queue.recover()
+
+    while True:
+        # Items are claimed one at a time as they are retrieved, so only those
+        # being retrieved (and the one being handled) are ever in flight
+        keys = _claim_each(queue)
+        for key, future in map_concurrently(fetch, keys, concurrency, ordered=False):
+            error = future.exception()
+            if error is None:
+                yield future.result()
+                queue.complete(key)  # Once the result was handled
+            else:
+                failed = _fail(queue, policy, key, error)
+                if failed is not None:
+                    yield failed
+
+        next_attempt = queue.get_next_attempt()
+        if next_attempt is None or not wait:
+            return
+
+        time.sleep(max(0, next_attempt - time.time()))
+
+
+def _claim_each(queue):
+    """Generate the pending keys which are due, claiming each one as it is taken."""
+    while True:
+        keys = queue.claim(1)
+        if not keys:
+            return
+
+        yield keys[0]
+
+
+def _fail(queue, policy, key, error):
+    """Record the error for the key, returning Failed if it was given up on (or raising)."""
+    if not isinstance(error, ITEM_ERRORS):
+        raise error
+
+    attempts = queue.get(key).attempts + 1
+    retry_at = policy.get_retry_at(error, attempts, time.time())
+    queue.fail(key, error, retry_at)
+    if retry_at is not None:
+        logger.info('Retrying "%s" (attempt %d failed): %s', key, attempts, error)
+        return None
+
+    return Failed({'when': datetime.utcnow(), 'key': key, 'attempts': attempts}, error)
+
+
+def _make_item(row):
+    key, state, attempts, next_attempt, error_code, error_tag, error_message = row
+    return JobItem(
+        json.loads(key), state, attempts, next_attempt,
+        None if error_code is None else RequestError.Code(error_code),
+        error_tag, error_message,
+    )
@@ -0,0 +1,47 @@
+"""Build the `meta` dict of a :class:`.Retrieved` result.
+
+Keeping the whole `requests.Response` in `meta['response']` pins its
+content, text and headers for as long as the result is kept. The meta policy
+controls what is kept instead:
+
+- 'full': the `requests.Response` itself (the default for single retrievals).
+- 'summary': a small :class:`.ResponseSummary` (the default for bulk retrievals).
+- 'none': no response at all.
+"""
+
+import hashlib
+from datetime import datetime
+
+from .consts import ResponseSummary
+
+META_POLICIES = ('none', 'summary', 'full')
+
+
+def make_meta(meta_policy, response, **meta):
+    """Return the meta dict with 'when', the given items and the response by the policy.
+
+    Raises:
+        ValueError: If the meta_policy is not one of META_POLICIES.
+    """
+    if meta_policy not in META_POLICIES:
+        raise ValueError('meta_policy must be one of %r (not %r)' % (META_POLICIES, meta_policy))
+
+    meta['when'] = datetime.utcnow()
+    if meta_policy == 'full':
+        meta['response'] = response
+    elif meta_policy == 'summary':
+        meta['response'] = summarise_response(response)
+
+    return meta
+
+
+def summarise_response(response):
+    """Return the :class:`.ResponseSummary` of a `requests.Response`."""
+    return ResponseSummary(
+        url=response.url,
+        status_code=response.status_code,
+        elapsed=response.elapsed,
+        content_length=len(response.content),
+        content_hash=hashlib.sha256(response.content).hexdigest(),
+        from_cache=getattr(response, 'from_cache', False),
+    )
@@ -0,0 +1,111 @@
+"""Build soups of HTML with a configurable parser backend.
+
+BeautifulSoup supports several parsers which vary a lot in speed: the
+built-in ``html.parser`` is always available but is the slowest, whereas
+``lxml`` is several times faster (``pip install lxml``).
+
+The parser can be chosen for the whole process::
+
+    mal_scraper.parsing.default_parser = 'lxml'
+
+or for a single call::
+
+    mal_scraper.get_anime(1, parser='lxml')
+
+If the chosen parser is not installed then we fall back to ``html.parser``.
+
+Web-pages are given as bytes and decoded once, by the encoding that they
+declare (without BeautifulSoup sniffing for it).
+"""
+
+import logging
+import re
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_PARSER = 'html.parser'
+
+DEFAULT_ENCODING = 'utf-8'
+"""The encoding of web-pages which do not declare one (MAL's pages are UTF-8)."""
+
+_content_type_charset_regex = re.compile(r'charset=["\']?([\w-]+)', re.IGNORECASE)
+_meta_charset_regex = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+default_parser = FALLBACK_PARSER
+"""The parser used when one is not given explicitly (e.g. 'lxml')."""
+
+_unavailable_parsers = set()  # Only warn once about each missing parser
+
+
+def make_soup(markup, parser=None, parse_only=None, from_encoding=None):
+    """Return a BeautifulSoup object of the markup.
+
+    Args:
+        markup (bytes or str): The HTML of the web-page.
+        parser (str, optional): The BeautifulSoup parser/tree-builder to use,
+            e.g. 'lxml', 'html5lib' or 'html.parser'. Defaults to
+            :data:`default_parser`.
+        parse_only (SoupStrainer, optional): Only build the tree for the
+            matching parts of the page (ignored by html5lib).
+        from_encoding (str, optional): The encoding of bytes markup, defaults
+            to the one it declares (see :func:`get_declared_encoding`).
+
+    Returns:
+        BeautifulSoup object
+    """
+    parser = parser or default_parser
+
+    kwargs = {'parse_only': parse_only}
+    if isinstance(markup, bytes):
+        kwargs['from_encoding'] = from_encoding or get_declared_encoding(markup)
+
+    if parser not in _unavailable_parsers:
+        try:
+            return BeautifulSoup(markup, parser, **kwargs)
+        except FeatureNotFound:
+            logger.warning('Parser "%s" is not installed, using "%s"', parser, FALLBACK_PARSER)
+            _unavailable_parsers.add(parser)
+
+    return BeautifulSoup(markup, FALLBACK_PARSER, **kwargs)
+
+
+def get_declared_encoding(content, content_type=None):
+    """Return the encoding declared for the web-page, or :data:`DEFAULT_ENCODING`.
+
+    Args:
+        content (bytes): The web-page, whose <meta> charset is looked for near
+            the start.
+        content_type (str, optional): The Content-Type header, which takes
+            precedence.
+    """
+    if content_type:
+        match = _content_type_charset_regex.search(content_type)
+        if match:
+            return match.group(1)
+
+    match = _meta_charset_regex.search(content, 0, 4096)
+    if match:
+        return match.group(1).decode('ascii')
+
+    return DEFAULT_ENCODING
+
+
+def get_response_encoding(response):
+    """Return the encoding declared for the response (see :func:`get_declared_encoding`)."""
+    return get_declared_encoding(response.content, response.headers.get('Content-Type'))
+
+
+def make_class_strainer(*classes):
+    """Return a SoupStrainer matching tags which have any of the given classes.
+
+    The tags are kept along with everything inside of them.
+    """
+    classes = frozenset(classes)
+
+    def has_class(value):
+        # Depending on bs4's version, we get the whole attribute or each class
+        return bool(value) and not classes.isdisjoint(value.split())
+
+    return SoupStrainer(class_=has_class)
@@ -0,0 +1,179 @@
+"""Limit the rate of requests so that MAL does not block us.
+
+A limiter only needs a `wait(url)` method which blocks until a request to the
+url may be made, so you can plug in your own (or pass None to not wait at all).
+Limiters may also have:
+
+- `reserve(url)` which returns the number of seconds to wait without blocking,
+  so that asyncio code can `await asyncio.sleep(limiter.reserve(url))`.
+- `feedback(url, response)` which is given every response so that it can
+  slow down when the server asks us to.
+
+By default the :data:`mal_scraper.requester.default_requester` enforces a
+:class:`RateLimiter` for every request made by the library.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Allow `rate` requests per second on average with bursts of `burst` (thread-safe).
+
+    Waiting is reserved in order, so the lock is never held while sleeping.
+
+    Args:
+        rate (float): The number of requests per second.
+        burst (int, optional): The number of requests which can be made at
+            once after being idle.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._last_time = time.monotonic()
+
+    def reserve(self, url=None):
+        """Take a token and return the number of seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0, -self._tokens / self.rate)
+
+    def wait(self, url=None):
+        """Block until the next request may be made."""
+        delay = self.reserve(url)
+        if delay > 0:
+            logger.debug('Sleeping for %.2f seconds...', delay)
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        """Make no further requests for the given number of seconds."""
+        with self._lock:
+            self._refill()
+            # Allow one request straight afterwards, but do not burst
+            self._tokens = min(self._tokens, 1) - seconds * self.rate
+
+    def set_rate(self, rate):
+        """Change the rate from now on."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 0:
+                self._tokens *= rate / self.rate  # Keep the reserved waits the same
+            self.rate = rate
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_time) * self.rate)
+        self._last_time = now
+
+
+class IntervalLimiter(TokenBucket):
+    """Space out requests by at least `interval` seconds (thread-safe).
+
+    Args:
+        interval (float): The minimum number of seconds between requests.
+    """
+
+    def __init__(self, interval):
+        super().__init__(1 / interval, burst=1)
+        self.interval = interval
+
+
+class RateLimiter:
+    """Limit requests with a :class:`TokenBucket` per host which adapts to the host.
+
+    When a host responds with 429 (Too Many Requests) or 503 (Service
+    Unavailable) we pause for its Retry-After and slow down, then gradually
+    recover our rate while it responds normally.
+
+    Args:
+        rate (float, optional): The number of requests per second to each host.
+        burst (int, optional): The number of requests which can be made at once.
+        per_host (dict, optional): {host: (rate, burst)} for particular hosts.
+        slowdown (float, optional): Multiply the rate by this when throttled.
+        recovery (float, optional): Multiply the rate by this for every normal
+            response (up to the original rate).
+        min_rate (float, optional): Never slow down below this rate.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, rate=1, burst=4, per_host=None, slowdown=0.5, recovery=1.05,
+                 min_rate=0.05):
+        self.rate = rate
+        self.burst = burst
+        self.per_host = dict(per_host or {})
+        self.slowdown = slowdown
+        self.recovery = recovery
+        self.min_rate = min_rate
+        self._buckets = {}  # host: TokenBucket
+        self._lock = threading.Lock()
+
+    def reserve(self, url):
+        """Take a token for the url's host and return the seconds to wait."""
+        return self.get_bucket(url).reserve()
+
+    def wait(self, url):
+        """Block until a request to the url may be made."""
+        self.get_bucket(url).wait()
+
+    def feedback(self, url, response):
+        """Slow down (or recover) according to the response from the url."""
+        bucket = self.get_bucket(url)
+        max_rate = self._get_limits(urlsplit(url).hostname)[0]
+
+        if response.status_code in self.THROTTLE_STATUSES:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            logger.warning(
+                'Throttled by "%s" (%d), retrying after %s seconds',
+                url, response.status_code, retry_after,
+            )
+            bucket.set_rate(max(self.min_rate, bucket.rate * self.slowdown))
+            if retry_after:
+                bucket.pause(retry_after)
+        elif bucket.rate < max_rate:
+            bucket.set_rate(min(max_rate, bucket.rate * self.recovery))
+
+    def get_bucket(self, url):
+        """Return the TokenBucket for the url's host."""
+        host = urlsplit(url).hostname
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*self._get_limits(host))
+            return self._buckets[host]
+
+    def _get_limits(self, host):
+        return self.per_host.get(host, (self.rate, self.burst))
+
+
+def parse_retry_after(value):
+    """Return the number of seconds in a Retry-After header, or None.
+
+    Args:
+        value (str or None): Either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0, (retry_at - datetime.now(timezone.utc)).total_seconds())
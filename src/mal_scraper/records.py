@@ -0,0 +1,95 @@
+"""Compact record types which can be returned instead of dicts.
+
+A dict per anime costs hundreds of bytes, which adds up over millions of
+list entries. Pass `record_type=` to the public functions to get immutable
+tuple-backed records instead::
+
+    meta, anime = mal_scraper.get_anime(1, record_type=AnimeRecord)
+    anime.name  # or anime['name'] as with the dict
+    anime.to_dict()  # The same dict as without record_type
+
+The records have the same field names as the dicts. Tags are interned
+frozensets (so every entry with the same tags shares them) and names are
+interned strings.
+"""
+
+import sys
+from collections import namedtuple
+from weakref import WeakValueDictionary
+
+_interned_tags = WeakValueDictionary()
+
+
+def intern_tags(tags):
+    """Return the tags as a frozenset shared with every other equal set of tags."""
+    tags = frozenset(map(sys.intern, tags))
+    return _interned_tags.setdefault(tags, tags)
+
+
+def make_record(record_type, data):
+    """Return the data dict as the record type (None or dict for the dict itself)."""
+    if record_type is None or record_type is dict:
+        return data
+
+    return record_type.from_dict(data)
+
+
+class _Record:
+    """Mixin for namedtuple records, which also allows record['field']."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:  # (Not the methods of the tuple)
+                raise KeyError(key)
+            return getattr(self, key)
+
+        return super().__getitem__(key)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return the record of a data dict."""
+        return cls(**data)
+
+    def to_dict(self):
+        """Return the data dict (as returned without a record type)."""
+        return dict(zip(self._fields, self))
+
+
+class AnimeRecord(_Record, namedtuple('AnimeRecord', [
+        'name', 'name_english', 'format', 'episodes', 'airing_status', 'airing_started',
+        'airing_finished', 'airing_premiere', 'mal_age_rating', 'mal_score',
+        'mal_scored_by', 'mal_rank', 'mal_popularity', 'mal_members', 'mal_favourites'])):
+    """An anime, see :func:`mal_scraper.get_anime`."""
+
+    __slots__ = ()
+
+
+class UserStats(_Record, namedtuple('UserStats', [
+        'name', 'last_online', 'joined', 'num_anime_watching', 'num_anime_completed',
+        'num_anime_on_hold', 'num_anime_dropped', 'num_anime_plan_to_watch'])):
+    """A user's statistics, see :func:`mal_scraper.get_user_stats`."""
+
+    __slots__ = ()
+
+
+class AnimeListEntry(_Record, namedtuple('AnimeListEntry', [
+        'name', 'id_ref', 'consumption_status', 'is_rewatch', 'score', 'progress', 'tags'])):
+    """An anime in a user's list, see :func:`mal_scraper.get_user_anime_list`.
+
+    The tags are an interned frozenset (a set in :meth:`to_dict`).
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return the record of a data dict."""
+        return cls(**dict(data, name=sys.intern(data['name']), tags=intern_tags(data['tags'])))
+
+    def to_dict(self):
+        """Return the data dict (as returned without a record type)."""
+        data = super().to_dict()
+        data['tags'] = set(self.tags)
+        return data
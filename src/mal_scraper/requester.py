@@ -1,4 +1,132 @@
+"""Make HTTP requests on behalf of the library.
+
+Every public function takes a `requester` which only needs a requests-like
+`get(url)` method, so you can control/limit/mock requests. By default we
+share a :class:`SessionRequester` which keeps connections to MAL alive and
+limits the rate of requests (see :mod:`mal_scraper.ratelimit`).
+"""
+
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .ratelimit import RateLimiter, parse_retry_after
+
+
+class SessionRequester:
+    """Make requests through a `requests.Session` with pooled keep-alive connections.
+
+    Reusing connections avoids a new TCP and TLS handshake on every request.
+
+    Args:
+        pool_connections (int, optional): The number of hosts to keep a pool for.
+        pool_maxsize (int, optional): The number of connections to keep alive per
+            host, which should be at least the number of threads making requests.
+        max_retries (int, optional): The number of times to retry connection
+            errors and 429/5xx responses before giving up. 429/503 responses
+            are retried by waiting on the limiter again (which has slowed down
+            and paused for any Retry-After), or for their Retry-After (or the
+            backoff) without a limiter.
+        backoff_factor (float, optional): Sleep for backoff_factor * 2^(retry - 1)
+            seconds between retries.
+        timeout (float or tuple, optional): Default timeout for every request,
+            see the Requests library.
+        limiter (limiter, optional): Wait on `limiter.wait(url)` before every
+            request (and give it `limiter.feedback(url, response)` if it has
+            that method), or None to not limit. See :mod:`mal_scraper.ratelimit`.
+
+    Attributes:
+        session (requests.Session): The underlying session, e.g. to add headers.
+        limiter (limiter): The limiter (which can be changed), or None.
+    """
+
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+    THROTTLE_STATUSES = (429, 503)  # Retried by get() rather than the adapter
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, max_retries=3,
+                 backoff_factor=0.5, timeout=None, limiter=None):
+        self.timeout = timeout
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+
+        # Retrying throttled responses within the adapter would bypass the
+        # limiter (which may be set at any time)
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=[
+                status for status in self.RETRY_STATUSES if status not in self.THROTTLE_STATUSES
+            ],
+            respect_retry_after_header=False,  # (Which would also retry 429/503)
+            raise_on_status=False,  # Return the last response so we can handle it
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url, **kwargs):
+        """Make a GET request, see `requests.get`."""
+        kwargs.setdefault('timeout', self.timeout)
+
+        for retry in range(self.max_retries):
+            response = self._get_once(url, **kwargs)
+            if response.status_code not in self.THROTTLE_STATUSES:
+                return response
+
+            if self.limiter is None:  # (Otherwise the limiter waits before the retry)
+                time.sleep(get_retry_delay(response, retry, self.backoff_factor))
+
+        return self._get_once(url, **kwargs)
+
+    def _get_once(self, url, **kwargs):
+        """Make a GET request through the limiter (as it is now)."""
+        limiter = self.limiter
+        if limiter is not None:
+            limiter.wait(url)
+
+        response = self.session.get(url, **kwargs)
+        if hasattr(limiter, 'feedback'):
+            limiter.feedback(url, response)
+
+        return response
+
+    def close(self):
+        """Close all of the pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_retry_delay(response, retry, backoff_factor):
+    """Return the seconds to wait before retrying a throttled response without a limiter.
+
+    Args:
+        response (requests-like response): The throttled response.
+        retry (int): The number of retries so far.
+        backoff_factor (float): Wait backoff_factor * 2^retry seconds unless
+            the response has a Retry-After header.
+    """
+    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+    return backoff_factor * 2 ** retry if retry_after is None else retry_after
+
+
+default_limiter = RateLimiter()
+"""The rate limit for every request made by the library by default."""
+
+default_requester = SessionRequester(limiter=default_limiter)
 
-# Our interface follows requests
-request_passthrough = requests
+# Our interface follows requests (kept for backwards compatibility)
+request_passthrough = default_requester
@@ -0,0 +1,254 @@
+"""Keep a local mirror of the anime up to date with as few requests as possible.
+
+The state of every id_ref (when it was last retrieved, what happened and a
+fingerprint of its data) is kept in a SQLite table so that each run only
+retrieves the anime which are due::
+
+    state = mal_scraper.sync.AnimeSyncState('anime_sync.sqlite')
+
+    for result in mal_scraper.sync.sync_anime(range(1, 40000), state):
+        if isinstance(result, mal_scraper.Retrieved):
+            mycode.save_data(result.data)
+
+Airing and pre-air shows are refreshed often, finished shows rarely (and more
+rarely while they do not change), and id_refs which do not exist are only
+probed again after a long time. See :class:`RefreshPolicy`.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from .anime import get_anime_many
+from .consts import AiringStatus, Failed
+from .exceptions import RequestError
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+SyncEntry = namedtuple('SyncEntry', [
+    'id_ref', 'last_fetched', 'last_status', 'airing_status', 'fingerprint', 'unchanged',
+    'next_fetch',
+])
+SyncEntry.__doc__ = """The sync state of an anime.
+
+Attributes:
+    id_ref (int): The anime.
+    last_fetched (float): When (time.time()) it was last retrieved.
+    last_status (str): 'ok', 'missing' (it does not exist) or 'failed'.
+    airing_status (AiringStatus or None): The last known airing status.
+    fingerprint (str or None): A hash of the last (stable) data.
+    unchanged (int): The number of times in a row the fingerprint was the same.
+    next_fetch (float): When (time.time()) it is due to be retrieved again.
+"""
+
+
+class RefreshPolicy:
+    """Decide when each anime is due to be retrieved again.
+
+    Args:
+        intervals (dict, optional): {AiringStatus: seconds} between retrieving
+            anime, overriding :attr:`INTERVALS`.
+        backoff (float, optional): Multiply the interval of a finished anime
+            by this for every time in a row that it did not change (airing
+            anime are always refreshed at their interval).
+        max_interval (float, optional): The most seconds between retrievals.
+        missing_interval (float, optional): Seconds before probing an id_ref
+            which does not exist again.
+        failed_interval (float, optional): Seconds before retrying a failure.
+    """
+
+    INTERVALS = {
+        AiringStatus.ongoing: 1 * DAY,
+        AiringStatus.pre_air: 3 * DAY,
+        AiringStatus.finished: 30 * DAY,
+        None: 7 * DAY,  # Unknown
+    }
+
+    # Due anime are retrieved in this order (lowest first)
+    PRIORITIES = {
+        AiringStatus.ongoing: 0,
+        AiringStatus.pre_air: 1,
+        AiringStatus.finished: 3,
+        None: 3,
+    }
+    NEW_PRIORITY = 2  # Never retrieved before
+    UNSUCCESSFUL_PRIORITY = 4  # Missing or failed last time
+
+    # Only these back off while unchanged (airing anime change without warning)
+    BACKOFF_STATUSES = frozenset((AiringStatus.finished,))
+
+    def __init__(self, intervals=None, backoff=2, max_interval=180 * DAY,
+                 missing_interval=90 * DAY, failed_interval=DAY / 4):
+        self.intervals = dict(self.INTERVALS, **(intervals or {}))
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.missing_interval = missing_interval
+        self.failed_interval = failed_interval
+
+    def get_interval(self, last_status, airing_status, unchanged):
+        """Return the number of seconds until the anime is due again."""
+        if last_status == 'missing':
+            return self.missing_interval
+        elif last_status == 'failed':
+            return self.failed_interval
+
+        interval = self.intervals[airing_status]
+        if airing_status in self.BACKOFF_STATUSES:
+            interval *= self.backoff ** unchanged
+
+        return min(interval, self.max_interval)
+
+    def get_priority(self, entry):
+        """Return the priority (lowest first) of a due SyncEntry (None if it is new)."""
+        if entry is None:
+            return self.NEW_PRIORITY
+        elif entry.last_status != 'ok':
+            return self.UNSUCCESSFUL_PRIORITY
+
+        return self.PRIORITIES[entry.airing_status]
+
+
+class AnimeSyncState:
+    """The sync state of every anime, kept in a SQLite database (thread-safe).
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+        policy (RefreshPolicy, optional): When to retrieve anime again.
+    """
+
+    def __init__(self, path=':memory:', policy=None):
+        self.policy = RefreshPolicy() if policy is None else policy
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS anime ('
+            ' id_ref INTEGER PRIMARY KEY, last_fetched REAL, last_status TEXT,'
+            ' airing_status TEXT, fingerprint TEXT, unchanged INTEGER, next_fetch REAL)'
+        )
+        self._connection.commit()
+
+    def get(self, id_ref):
+        """Return the SyncEntry of the anime, or None if it was never retrieved."""
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT * FROM anime WHERE id_ref = ?', (id_ref,),
+            ).fetchone()
+
+        return None if row is None else _make_entry(row)
+
+    def get_due(self, id_refs, now=None):
+        """Return the list of id_refs which are due to be retrieved, in priority order.
+
+        Args:
+            id_refs (iterable of int): The anime to consider (e.g. a range).
+            now (float, optional): The time.time() to consider, defaults to now.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entries = {
+                row[0]: _make_entry(row)
+                for row in self._connection.execute('SELECT * FROM anime')
+            }
+
+        due = []
+        for id_ref in id_refs:
+            entry = entries.get(id_ref)
+            if entry is None or entry.next_fetch <= now:
+                due.append((self.policy.get_priority(entry), id_ref))
+
+        return [id_ref for priority, id_ref in sorted(due)]
+
+    def record(self, result, now=None):
+        """Update the state of the anime from the result of retrieving it.
+
+        Args:
+            result (Retrieved or Failed): From :func:`mal_scraper.get_anime_many`.
+            now (float, optional): The time.time() of the result, defaults to now.
+        """
+        now = time.time() if now is None else now
+        id_ref = result.meta['id_ref']
+        previous = self.get(id_ref)
+
+        if isinstance(result, Failed):
+            missing = (
+                isinstance(result.error, RequestError) and
+                result.error.code == RequestError.Code.does_not_exist
+            )
+            last_status = 'missing' if missing else 'failed'
+            airing_status = previous and previous.airing_status
+            fingerprint = previous and previous.fingerprint
+            unchanged = previous.unchanged if previous else 0
+        else:
+            last_status = 'ok'
+            airing_status = result.data['airing_status']
+            fingerprint = get_fingerprint(result.data)
+            same = previous is not None and previous.fingerprint == fingerprint
+            unchanged = previous.unchanged + 1 if same else 0
+
+        next_fetch = now + self.policy.get_interval(last_status, airing_status, unchanged)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO anime VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (id_ref, now, last_status, airing_status and airing_status.value,
+                 fingerprint, unchanged, next_fetch),
+            )
+            self._connection.commit()
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+
+def sync_anime(id_refs, state, now=None, **kwargs):
+    """Generate the results of retrieving only the anime which are due.
+
+    The state is updated with every result.
+
+    Args:
+        id_refs (iterable of int): The anime to keep in sync (e.g. a range).
+        state (AnimeSyncState): The sync state of the anime.
+        now (float, optional): The time.time() to sync at, defaults to now.
+        kwargs: Passed on to :func:`mal_scraper.get_anime_many`
+            (e.g. concurrency).
+
+    Yields:
+        :class:`.Retrieved` or :class:`.Failed` as :func:`mal_scraper.get_anime_many`.
+    """
+    due = state.get_due(id_refs, now)
+    logger.info('Syncing %d anime which are due', len(due))
+
+    for result in get_anime_many(due, **kwargs):
+        state.record(result, now)
+        yield result
+
+
+# MAL's statistics change daily so they would make every anime look changed
+VOLATILE_KEYS = frozenset((
+    'mal_score', 'mal_scored_by', 'mal_rank', 'mal_popularity', 'mal_members',
+    'mal_favourites',
+))
+
+
+def get_fingerprint(data):
+    """Return a hash (str) of the anime's data (dict or record) except for the statistics."""
+    if hasattr(data, 'to_dict'):
+        data = data.to_dict()
+
+    stable = sorted(
+        (key, repr(value)) for key, value in data.items() if key not in VOLATILE_KEYS
+    )
+    return hashlib.sha256(repr(stable).encode('utf-8')).hexdigest()
+
+
+def _make_entry(row):
+    id_ref, last_fetched, last_status, airing_status, fingerprint, unchanged, next_fetch = row
+    return SyncEntry(
+        id_ref, last_fetched, last_status,
+        None if airing_status is None else AiringStatus(airing_status),
+        fingerprint, unchanged, next_fetch,
+    )
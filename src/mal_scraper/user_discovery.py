@@ -1,14 +1,42 @@
-"""Discover user_ids (automatically)."""
+"""Discover user_ids (automatically).
 
+The web-pages retrieved by :func:`mal_scraper.get_anime` and
+:func:`mal_scraper.get_user_stats` link to many users. These can be collected
+(for :func:`discover_users`) as the pages are retrieved, but scanning every
+page costs time, so it is off by default. Turn it on with::
+
+    mal_scraper.user_discovery.default_discovery_hook.set_mode('deferred')
+
+The modes (:data:`DISCOVERY_MODES`) are:
+
+- 'disabled': do not scan pages (the default).
+- 'sync': scan each page before the call returns.
+- 'deferred': queue each page to be scanned by a background thread.
+
+The users are kept in memory by default. Keep them in a database instead to
+only discover users which are new since previous runs::
+
+    mal_scraper.user_discovery.default_discovery_hook.store = SQLiteUserStore('users.sqlite')
+"""
+
+import abc
 import logging
 import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from queue import Full, Queue
 
-from .requester import request_passthrough
+from .bloom import BloomFilter
+from .requester import default_requester
 
 logger = logging.getLogger(__name__)
 
+DISCOVERY_MODES = ('disabled', 'sync', 'deferred')
 
-def discover_users(requester=request_passthrough, use_cache=True, use_web=None):
+
+def discover_users(requester=default_requester, use_cache=True, use_web=None):
     """Return a set of user_ids usable by other user related library calls.
 
     By default we will attempt to return any in our cache - clearing the cache
@@ -16,7 +44,8 @@ def discover_users(requester=request_passthrough, use_cache=True, use_web=None):
     find some on MAL but these will be biased towards recently active users.
 
     The cache is built up by discovering users from all of the other web-pages
-    retrieved from other API calls as you make those calls.
+    retrieved from other API calls as you make those calls, if that is enabled
+    (see :data:`default_discovery_hook`).
 
     Args:
         requester (requests-like, optional): HTTP request maker.
@@ -51,22 +80,27 @@ def discover_users(requester=request_passthrough, use_cache=True, use_web=None):
 
             users_from_web = mal_scraper.discover_users(use_cache=False)
     """
-    # TODO: Dependency injection for user store
     # TODO: Test this method
     discovered_users = set()
 
     if use_cache:
-        discovered_users |= default_user_store.get_and_clear_cache()
+        default_discovery_hook.flush()
+        discovered_users |= default_discovery_hook.store.get_and_clear_cache()
 
     # Force use web, or fall-back to web if the cache is empty
     if use_web or (use_web is None and not discovered_users):
         response = requester.get(get_url_for_user_discovery())
-        response.raise_for_status()  # May raise
-        discovered_users |= set(discover_users_from_html(response.text))
+        discovered_users |= _process_discovery_response(response)
 
     return discovered_users
 
 
+def _process_discovery_response(response):
+    """Return the set of user_ids from the response to the discovery page."""
+    response.raise_for_status()  # May raise
+    return set(discover_users_from_html(response.content, unique=True))
+
+
 def get_url_for_user_discovery():
     """Return the URL to the profile discovery page."""
     # Use HTTPS to avoid auto-redirect from HTTP (except for tests)
@@ -75,17 +109,21 @@ def get_url_for_user_discovery():
     return '{}://myanimelist.net/users.php'.format(protocol)
 
 
-_username_regex = re.compile(
-    r"href=[\"'](https?\://myanimelist\.net)?/profile/(?P<username>\w+)[\w/]*[\"']",
-    re.ASCII | re.DOTALL | re.IGNORECASE,
-)
+# Links to profiles are found by a (fast) literal search for "/profile/"...
+_profile_link_regex = re.compile(rb'/profile/(\w+)[\w/]*["\']', re.ASCII)
+# ...which must be the start of the link
+_link_prefix_regex = re.compile(rb'href=["\'](https?://myanimelist\.net)?\Z')
+_LINK_PREFIX_SIZE = len('href="https://myanimelist.net')
 
 
-def discover_users_from_html(html):
-    """Generate usernames from the given HTML (usernames may be duplicated)
+def discover_users_from_html(html, unique=False):
+    """Generate usernames from the given HTML.
 
     Args:
-        html (str): HTML to hunt through
+        html (str or bytes): HTML to hunt through. Bytes (i.e. the undecoded
+            web-page in any ASCII-compatible encoding) are faster.
+        unique (bool, optional): Generate each username once (True), or as
+            many times as they are linked (False).
 
     Yields:
         user_id (string)
@@ -96,22 +134,295 @@ def discover_users_from_html(html):
         <a href="https://myanimelist.net/profile/TheLlama">
         <a href="/profile/TheLlama/reviews">All reviews</a>
     """
-    return (m.group('username') for m in _username_regex.finditer(html))
+    if isinstance(html, str):
+        html = html.encode('utf-8')
+
+    seen = set()
+    for match in _profile_link_regex.finditer(html):
+        start = match.start()
+        prefix = html[max(0, start - _LINK_PREFIX_SIZE):start].lower()
+        if not _link_prefix_regex.search(prefix):
+            continue
+
+        username = match.group(1)
+        if unique:
+            if username in seen:
+                continue
+            seen.add(username)
+
+        yield username.decode('ascii')
 
 
-class UserStore:
-    """Cache the dynamic discovery of users."""
+class UserStore(abc.ABC):
+    """Cache the dynamic discovery of users (the interface of every store).
 
-    def __init__(self):
-        self.cache = set()
+    A store is given the user_ids as they are discovered and hands each one
+    out (from :meth:`get_and_clear_cache`) once. Stores must be thread-safe.
+    """
 
     def store_users_from_html(self, html):
-        """Store the users discovered in the cache from the given HTML text."""
-        self.cache |= set(discover_users_from_html(html))
+        """Store the users discovered in the cache from the given HTML (str or bytes)."""
+        self.store_users(discover_users_from_html(html, unique=True))
+
+    @abc.abstractmethod
+    def store_users(self, user_ids):
+        """Store the user_ids in the cache."""
+
+    @abc.abstractmethod
+    def get_and_clear_cache(self):
+        """Return the set of user_ids in the cache, removing them from it."""
+
+
+class MemoryUserStore(UserStore):
+    """Keep the discovered users in memory (thread-safe).
+
+    Args:
+        max_users (int, optional): The most user_ids to keep (the oldest are
+            evicted first), or None for no limit.
+
+    Attributes:
+        evicted (int): The number of user_ids evicted so far.
+    """
+
+    def __init__(self, max_users=None):
+        self.max_users = max_users
+        self.evicted = 0
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def store_users(self, user_ids):
+        with self._lock:
+            self._users.update(dict.fromkeys(user_ids))
+            while self.max_users is not None and len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+                self.evicted += 1
 
     def get_and_clear_cache(self):
-        cache, self.cache = self.cache, set()
-        return cache
+        with self._lock:
+            users, self._users = self._users, OrderedDict()
 
+        return set(users)
+
+    def __len__(self):
+        return len(self._users)
+
+
+class BloomUserStore(MemoryUserStore):
+    """Keep the discovered users in memory, handing out each one only once.
+
+    The users which were ever stored are remembered in a
+    :class:`mal_scraper.bloom.BloomFilter`, in constant memory. A small
+    fraction of new users (the filter's false-positive rate) are wrongly
+    thought to have been seen and are never handed out.
+
+    Args:
+        seen (BloomFilter, optional): The users seen so far, e.g. loaded from
+            a file with `BloomFilter.load(path)`. Defaults to a filter for
+            ten million users with a 1% false-positive rate.
+        max_users (int, optional): See :class:`MemoryUserStore`.
+
+    Attributes:
+        seen (BloomFilter): Save this with `seen.save(path)` to remember the
+            users in a later run.
+    """
+
+    def __init__(self, seen=None, max_users=None):
+        super().__init__(max_users)
+        self.seen = BloomFilter(10000000) if seen is None else seen
+
+    def store_users(self, user_ids):
+        with self._lock:
+            new_user_ids = [user_id for user_id in user_ids if self.seen.add(user_id)]
+
+        super().store_users(new_user_ids)
+
+    def is_known(self, user_id):
+        """Return whether the user_id was (probably) ever stored."""
+        with self._lock:
+            return user_id in self.seen
+
+
+class SQLiteUserStore(UserStore):
+    """Keep the discovered users in a SQLite database, remembering them across runs.
+
+    Each user_id is only ever handed out once (even by another run with the
+    same database), so discovery only yields users which are new to us.
+    This is thread-safe.
+
+    Args:
+        path (str, optional): The SQLite database file, or ':memory:'.
+    """
+
+    def __init__(self, path=':memory:'):
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS users ('
+            ' user_id TEXT PRIMARY KEY, discovered_at REAL, handed_out_at REAL)'
+        )
+        self._connection.execute(
+            'CREATE INDEX IF NOT EXISTS users_handed_out_at ON users (handed_out_at)'
+        )
+        self._connection.commit()
+
+    def store_users(self, user_ids):
+        now = time.time()
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO users VALUES (?, ?, NULL)',
+                ((user_id, now) for user_id in set(user_ids)),
+            )
+            self._connection.commit()
+
+    def get_and_clear_cache(self):
+        with self._lock:
+            users = {
+                row[0] for row in self._connection.execute(
+                    'SELECT user_id FROM users WHERE handed_out_at IS NULL'
+                )
+            }
+            self._connection.execute(
+                'UPDATE users SET handed_out_at = ? WHERE handed_out_at IS NULL', (time.time(),),
+            )
+            self._connection.commit()
+
+        return users
+
+    def mark_crawled(self, user_ids):
+        """Remember the user_ids as handed out, e.g. they were found another way."""
+        now = time.time()
+        user_ids = set(user_ids)
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO users VALUES (?, ?, NULL)',
+                ((user_id, now) for user_id in user_ids),
+            )
+            self._connection.executemany(
+                'UPDATE users SET handed_out_at = ? WHERE user_id = ? AND handed_out_at IS NULL',
+                ((now, user_id) for user_id in user_ids),
+            )
+            self._connection.commit()
+
+    def is_known(self, user_id):
+        """Return whether the user_id was ever stored."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT 1 FROM users WHERE user_id = ?', (user_id,),
+            ).fetchone() is not None
+
+    def close(self):
+        """Close the database."""
+        self._connection.close()
+
+    def __len__(self):
+        """Return the number of users waiting to be handed out."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM users WHERE handed_out_at IS NULL'
+            ).fetchone()[0]
+
+
+default_user_store = MemoryUserStore()
+
+
+DiscoveryStats = namedtuple('DiscoveryStats', [
+    'pages_submitted',  # Pages given to the hook while it was enabled
+    'pages_scanned',
+    'pages_dropped',  # Pages not queued because the queue was full
+    'users_found',  # Counting each user once per page
+    'scan_seconds',  # Total time spent scanning pages
+    'queued',  # Pages waiting to be scanned
+])
+
+
+class DiscoveryHook:
+    """Discover users from the retrieved web-pages, see :data:`DISCOVERY_MODES`.
+
+    Args:
+        store (UserStore): Where to store the discovered users.
+        mode (str, optional): One of :data:`DISCOVERY_MODES`.
+        max_queued (int, optional): The maximum number of pages waiting to
+            be scanned in 'deferred' mode. Further pages are dropped rather
+            than blocking the caller.
+    """
 
-default_user_store = UserStore()
+    def __init__(self, store, mode='disabled', max_queued=100):
+        self.store = store
+        self.mode = 'disabled'
+        self._queue = Queue(max_queued)
+        self._worker = None
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(DiscoveryStats._fields[:-1], 0)
+        self.set_mode(mode)
+
+    def set_mode(self, mode):
+        """Change the mode, scanning any queued pages when leaving 'deferred' mode.
+
+        Raises:
+            ValueError: If the mode is not one of DISCOVERY_MODES.
+        """
+        if mode not in DISCOVERY_MODES:
+            raise ValueError('mode must be one of %r (not %r)' % (DISCOVERY_MODES, mode))
+
+        if mode == 'deferred' and self._worker is None:
+            # The worker idles (rather than finishes) when we leave 'deferred' mode
+            self._worker = threading.Thread(
+                target=self._scan_queued, name='mal_scraper-discovery', daemon=True,
+            )
+            self._worker.start()
+
+        self.mode = mode
+        if mode != 'deferred':
+            self.flush()
+
+    def submit(self, html):
+        """Discover the users in the HTML (str or bytes) by the mode."""
+        mode = self.mode
+        if mode == 'disabled':
+            return
+
+        self._add_stats(pages_submitted=1)
+        if mode == 'sync':
+            self._scan(html)
+            return
+
+        try:
+            self._queue.put_nowait(html)
+        except Full:
+            self._add_stats(pages_dropped=1)
+
+    def flush(self):
+        """Wait until every queued page has been scanned."""
+        self._queue.join()
+
+    def get_stats(self):
+        """Return the :class:`DiscoveryStats` so far."""
+        with self._lock:
+            return DiscoveryStats(queued=self._queue.qsize(), **self._stats)
+
+    def _scan(self, html):
+        start = time.perf_counter()
+        users = set(discover_users_from_html(html, unique=True))
+        self.store.store_users(users)
+        self._add_stats(
+            pages_scanned=1, users_found=len(users), scan_seconds=time.perf_counter() - start,
+        )
+
+    def _scan_queued(self):
+        while True:
+            html = self._queue.get()
+            try:
+                self._scan(html)
+            except Exception:
+                logger.exception('Failed to discover users from a web-page')
+            finally:
+                self._queue.task_done()
+
+    def _add_stats(self, **stats):
+        with self._lock:
+            for name, value in stats.items():
+                self._stats[name] += value
+
+
+default_discovery_hook = DiscoveryHook(default_user_store)
+"""Discover users from the web-pages retrieved by the library (disabled by default)."""
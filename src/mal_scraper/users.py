@@ -12,24 +12,36 @@ Possible alternative:
 - http://graph.anime.plus/
 """
 
+import hashlib
 import logging
-import time
+from collections import namedtuple
+from contextlib import closing
 from datetime import datetime
 from functools import partial
+from itertools import count
 
-from bs4 import BeautifulSoup
-
-from .consts import ConsumptionStatus, Retrieved
+from .concurrency import map_concurrently, parse_with_memo, retrieve_many
+from .consts import ConsumptionStatus, Failed, Retrieved
 from .exceptions import MissingTagError, ParseError, RequestError
 from .mal_utils import get_date, get_datetime
-from .requester import request_passthrough
-from .user_discovery import default_user_store
+from .meta import make_meta
+from .parsing import get_response_encoding, make_class_strainer, make_soup
+from .ratelimit import IntervalLimiter
+from .records import make_record
+from .requester import default_requester
+from .user_discovery import default_discovery_hook
 
 logger = logging.getLogger(__name__)
-user_cache = set()  # Global store of discovered users
 
+# Bump whenever the data extracted from the web-page changes (see mal_scraper.cache.ResultCache)
+PARSER_VERSION = 1
+
+# Wait between pages of anime lists (MAL blocks fast scraping of them)
+default_anime_list_limiter = IntervalLimiter(2)
 
-def get_user_stats(user_id, requester=request_passthrough):
+
+def get_user_stats(user_id, requester=default_requester, parser=None, result_cache=None,
+                   record_type=None, meta_policy='full'):
     """Return statistics about a particular user.
 
     # TODO: Return Gender Male/Female
@@ -41,6 +53,14 @@ def get_user_stats(user_id, requester=request_passthrough):
         user_id (string): The username identifier of the MAL user.
         requester (requests-like, optional): HTTP request maker.
             This allows us to control/limit/mock requests.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+            See :mod:`mal_scraper.parsing`.
+        result_cache (mal_scraper.cache.ResultCache, optional): Reuse the data
+            parsed from an identical web-page before (e.g. with a response cache).
+        record_type (type, optional): Return the data as
+            :class:`mal_scraper.records.UserStats` rather than a dict.
+        meta_policy (str, optional): What to keep of the response in
+            `meta['response']`: 'full', 'summary' or 'none'. See :mod:`mal_scraper.meta`.
 
     Returns:
         :class:`.Retrieved`: with the attributes `meta` and `data`.
@@ -66,11 +86,72 @@ def get_user_stats(user_id, requester=request_passthrough):
         .ParseError: Upon processing the web-page including anything that does
             not meet expectations.
     """
+    response = _get_user_stats_response(user_id, requester)
+    parse = partial(get_user_stats_from_html, parser=parser)
+    data = parse_with_memo(  # May raise
+        parse, _bind(result_cache), response.content, get_response_encoding(response),
+    )
+    return _make_retrieved(user_id, response, make_record(record_type, data), meta_policy)
+
+
+def get_user_stats_many(user_ids, concurrency=4, ordered=True, requester=default_requester,
+                        parser=None, processes=None, chunksize=1, result_cache=None,
+                        record_type=None, meta_policy='summary'):
+    """Generate statistics about many users which are retrieved concurrently.
+
+    See :func:`mal_scraper.get_anime_many`, which this mirrors.
+
+    Args:
+        user_ids (iterable of str): The usernames, consumed lazily.
+        concurrency (int, optional): The number of users to retrieve at once.
+        ordered (bool, optional): Generate in the order of the user_ids (True),
+            or as soon as each user is retrieved (False).
+        requester (requests-like, optional): HTTP request maker, which must be
+            thread-safe.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+        processes (int, optional): Parse the web-pages in this many processes
+            rather than on the retrieving threads.
+        chunksize (int, optional): The number of web-pages to send to a process
+            at once (when using processes).
+        result_cache (mal_scraper.cache.ResultCache, optional): See :func:`get_user_stats`.
+        record_type (type, optional): See :func:`get_user_stats`.
+        meta_policy (str, optional): See :func:`get_user_stats`. Only a summary
+            of each response is kept by default so that memory stays flat.
+
+    Yields:
+        :class:`.Retrieved` as for :func:`get_user_stats`, or :class:`.Failed`
+        with the error for that user_id.
+    """
+    fetch = partial(_get_user_stats_response, requester=requester)
+    parse = partial(get_user_stats_from_html, parser=parser)
+    results = retrieve_many(
+        user_ids, fetch, parse, concurrency, ordered, processes, chunksize, _bind(result_cache),
+    )
+
+    for user_id, response, data, error in results:
+        if error is None:
+            data = make_record(record_type, data)
+            yield _make_retrieved(user_id, response, data, meta_policy)
+        else:
+            yield Failed({'when': datetime.utcnow(), 'user_id': user_id}, error)
+
+
+def _bind(result_cache):
+    return None if result_cache is None else result_cache.bind('user_stats', PARSER_VERSION)
+
+
+def _get_user_stats_response(user_id, requester):
+    """Return the checked response to the user's profile (see get_user_stats)."""
     url = get_profile_url_for_user(user_id)
     logger.debug('Retrieving profile for "%s" from "%s"', user_id, url)
 
     response = requester.get(url)
-    if not response.ok:  # Raise an exception
+    _check_user_stats_response(user_id, response)
+    return response
+
+
+def _check_user_stats_response(user_id, response):
+    if response.status_code >= 400:  # Raise an exception
         if response.status_code == 404:
             msg = 'User "%s" does not exist' % user_id
             raise RequestError(RequestError.Code.does_not_exist, msg)
@@ -78,21 +159,26 @@ def get_user_stats(user_id, requester=request_passthrough):
         response.raise_for_status()  # Will raise unknown error
 
     # Auto user_id discovery
-    default_user_store.store_users_from_html(response.text)
+    default_discovery_hook.submit(response.content)
+
 
-    soup = BeautifulSoup(response.content, 'html.parser')
-    data = get_user_stats_from_soup(soup)  # May raise
+def _process_user_stats_response(user_id, response, parser=None, result_cache=None,
+                                 record_type=None, meta_policy='full'):
+    """Return the Retrieved stats from the response to the profile (see get_user_stats)."""
+    _check_user_stats_response(user_id, response)
+    parse = partial(get_user_stats_from_html, parser=parser)
+    data = parse_with_memo(  # May raise
+        parse, _bind(result_cache), response.content, get_response_encoding(response),
+    )
+    return _make_retrieved(user_id, response, make_record(record_type, data), meta_policy)
 
-    meta = {
-        'when': datetime.utcnow(),
-        'user_id': user_id,
-        'response': response,
-    }
 
-    return Retrieved(meta, data)
+def _make_retrieved(user_id, response, data, meta_policy='full'):
+    return Retrieved(make_meta(meta_policy, response, user_id=user_id), data)
 
 
-def get_user_anime_list(user_id, requester=request_passthrough):
+def get_user_anime_list(user_id, requester=default_requester, concurrency=1,
+                        limiter=default_anime_list_limiter, record_type=None):
     """Return the anime listed by the user on their profile.
 
     This will make multiple network requests (possibly > 10).
@@ -103,6 +189,14 @@ def get_user_anime_list(user_id, requester=request_passthrough):
         user_id (str): The user identifier (i.e. the username).
         requester (requests-like, optional): HTTP request maker.
             This allows us to control/limit/mock requests.
+        concurrency (int, optional): The number of pages to retrieve at once.
+            Every page is the size of the first (except the last) so the
+            following pages are retrieved speculatively until an empty page.
+        limiter (limiter, optional): Wait on `limiter.wait(url)` before every
+            request, or None to not wait. By default requests are 2 seconds
+            apart (across all threads). See :mod:`mal_scraper.ratelimit`.
+        record_type (type, optional): Return each anime-info as
+            :class:`mal_scraper.records.AnimeListEntry` rather than a dict.
 
     Returns:
         A list of anime-info where each anime-info is the following dict::
@@ -131,33 +225,234 @@ def get_user_anime_list(user_id, requester=request_passthrough):
         .ParseError: Upon processing the web-page including anything that does
             not meet expectations.
     """
-    anime = []
-    has_more_anime = True
-    while has_more_anime:
-        url = get_anime_list_url_for_user(user_id, len(anime))
-        logging.debug('(Network) Retrieving anime list from "%s"', url)
-        # TODO: Do not sleep here!!! Make middleware
-        logger.debug('Sleeping for 2 seconds...')
-        time.sleep(2)
-
-        response = requester.get(url)
-        if not response.ok:  # Raise an exception
-            if response.status_code in (400, 401):
-                msg = 'Access to user "%s"\'s anime list is forbidden' % user_id
-                raise RequestError(RequestError.Code.forbidden, msg)
-            elif response.status_code == 404:
-                msg = 'User "%s" does not exist' % user_id
-                raise RequestError(RequestError.Code.does_not_exist, msg)
-
-            response.raise_for_status()  # Will raise
-
-        additional_anime = get_user_anime_list_from_json(response.json())
-        if additional_anime:
-            anime.extend(additional_anime)
+    return list(iter_user_anime_list(
+        user_id, requester, concurrency, limiter, record_type=record_type,
+    ))
+
+
+def iter_user_anime_list(user_id, requester=default_requester, concurrency=1,
+                         limiter=default_anime_list_limiter, pages=False, record_type=None):
+    """Generate the anime listed by the user as each page is retrieved.
+
+    Only a page (or `concurrency` pages) is held at once, so the anime can be
+    streamed to storage with flat memory however long the list is.
+
+    Args:
+        user_id (str): The user identifier (i.e. the username).
+        requester (requests-like, optional): HTTP request maker.
+        concurrency (int, optional): See :func:`get_user_anime_list`.
+        limiter (limiter, optional): See :func:`get_user_anime_list`.
+        pages (bool, optional): Generate a list of anime per page rather than
+            each anime.
+        record_type (type, optional): See :func:`get_user_anime_list`.
+
+    Yields:
+        Each anime-info dict as :func:`get_user_anime_list` (or lists of them).
+
+    Raises:
+        As :func:`get_user_anime_list` (when the page is retrieved).
+    """
+    get_page = partial(_get_anime_list_page, user_id, requester, limiter)
+
+    for page in _iter_anime_list_pages(get_page, concurrency):
+        if record_type is not None:
+            page = [make_record(record_type, anime) for anime in page]
+
+        if pages:
+            yield page
         else:
-            has_more_anime = False
+            yield from page
 
-    return anime
+
+AnimeListDiff = namedtuple('AnimeListDiff', [
+    'added', 'removed', 'changed', 'anime', 'fingerprint',
+])
+AnimeListDiff.__doc__ = """The changes to a user's anime list (see get_user_anime_list_changes).
+
+Attributes:
+    added (list of int): The id_refs which were added.
+    removed (list of int): The id_refs which were removed.
+    changed (dict): {id_ref: {key: (old, new)}} for the keys in LIST_DIFF_KEYS.
+    anime (list): The whole list now (as :func:`get_user_anime_list`).
+    fingerprint (str): A hash of the list now to store for the next run.
+"""
+
+# The parts of each anime in a list which are compared
+LIST_DIFF_KEYS = ('consumption_status', 'is_rewatch', 'score', 'progress', 'tags')
+
+
+def get_user_anime_list_changes(user_id, previous, requester=default_requester, concurrency=1,
+                                limiter=default_anime_list_limiter, record_type=None):
+    """Return the changes to the anime listed by the user since the previous list.
+
+    The whole list is retrieved, so no change is missed.
+
+    Args:
+        user_id (str): The user identifier (i.e. the username).
+        previous (list): The list from before (as :func:`get_user_anime_list`),
+            or `AnimeListDiff.anime` from the previous run.
+        requester (requests-like, optional): HTTP request maker.
+        concurrency (int, optional): See :func:`get_user_anime_list`.
+        limiter (limiter, optional): See :func:`get_user_anime_list`.
+        record_type (type, optional): See :func:`get_user_anime_list` (the
+            previous list should be of the same type).
+
+    Returns:
+        :class:`AnimeListDiff`
+
+    Raises:
+        As :func:`get_user_anime_list`.
+    """
+    anime = get_user_anime_list(
+        user_id, requester, concurrency, limiter, record_type=record_type,
+    )
+    added, removed, changed = diff_user_anime_lists(previous, anime)
+    return AnimeListDiff(added, removed, changed, anime, get_anime_list_fingerprint(anime))
+
+
+def get_user_anime_list_guessing_the_rest(user_id, previous, requester=default_requester,
+                                          concurrency=1, limiter=default_anime_list_limiter,
+                                          record_type=None):
+    """Return the user's anime list, guessing that the rest is unchanged from a repeated page.
+
+    THIS IS LOSSY. Pages are retrieved until one (after the first) is the same
+    as in the previous list, and the rest of the previous list is then assumed
+    to be unchanged. MAL sorts lists by status then title, so any addition,
+    removal or change of status before that page would have shifted it, but
+    changes to the score, progress or tags of the later anime are missed. Only
+    use this between occasional complete runs of :func:`get_user_anime_list`
+    (or :func:`get_user_anime_list_changes`).
+
+    Args:
+        user_id (str): The user identifier (i.e. the username).
+        previous (list): The list from before (as :func:`get_user_anime_list`).
+        requester (requests-like, optional): HTTP request maker.
+        concurrency (int, optional): See :func:`get_user_anime_list`.
+        limiter (limiter, optional): See :func:`get_user_anime_list`.
+        record_type (type, optional): See :func:`get_user_anime_list` (the
+            previous list should be of the same type).
+
+    Returns:
+        (anime, guessed): The list (as :func:`get_user_anime_list`) and whether
+        the rest of it was guessed from the previous list (False if every page
+        was retrieved).
+
+    Raises:
+        As :func:`get_user_anime_list`.
+    """
+    anime = []
+    pages = iter_user_anime_list(
+        user_id, requester, concurrency, limiter, pages=True, record_type=record_type,
+    )
+    for page in pages:
+        offset = len(anime)
+        anime.extend(page)
+
+        if offset and _is_same_page(page, previous[offset:offset + len(page)]):
+            pages.close()
+            anime.extend(previous[len(anime):])
+            return anime, True
+
+    return anime, False
+
+
+def diff_user_anime_lists(previous, current):
+    """Return (added, removed, changed) between two lists, see :class:`AnimeListDiff`."""
+    previous = {anime['id_ref']: anime for anime in previous}
+    current = {anime['id_ref']: anime for anime in current}
+
+    added = [id_ref for id_ref in current if id_ref not in previous]
+    removed = [id_ref for id_ref in previous if id_ref not in current]
+
+    changed = {}
+    for id_ref in current.keys() & previous.keys():
+        before, after = previous[id_ref], current[id_ref]
+        differences = {
+            key: (before[key], after[key])
+            for key in LIST_DIFF_KEYS if before[key] != after[key]
+        }
+        if differences:
+            changed[id_ref] = differences
+
+    return added, removed, changed
+
+
+def get_anime_list_fingerprint(anime):
+    """Return a hash (str) of a list (as :func:`get_user_anime_list`), ignoring its order."""
+    entries = sorted(_get_list_key(entry) for entry in anime)
+    return hashlib.sha256(repr(entries).encode('utf-8')).hexdigest()
+
+
+def _get_list_key(anime):
+    """Return an orderable tuple of the id_ref and the compared parts of the anime."""
+    return (
+        anime['id_ref'], anime['consumption_status'].value, anime['is_rewatch'],
+        anime['score'], anime['progress'], tuple(sorted(anime['tags'])),
+    )
+
+
+def _is_same_page(page, previous_page):
+    return [_get_list_key(anime) for anime in page] == [
+        _get_list_key(anime) for anime in previous_page
+    ]
+
+
+def _iter_anime_list_pages(get_page, concurrency):
+    """Generate the non-empty pages of an anime list in order.
+
+    Args:
+        get_page (callable): get_page(offset) returns the page of anime.
+        concurrency (int): The number of pages to retrieve at once.
+    """
+    page = get_page(0)
+    if not page:
+        return
+
+    yield page
+    page_size = offset = len(page)
+
+    while True:
+        offsets = count(offset, page_size)
+        with closing(map_concurrently(get_page, offsets, concurrency)) as pages:
+            for page_offset, future in pages:
+                page = future.result()  # May raise
+                if not page:
+                    return
+
+                yield page
+                offset = page_offset + len(page)
+                if len(page) != page_size:
+                    break  # The following offsets were speculated wrongly
+
+
+def _get_anime_list_page(user_id, requester, limiter, offset, from_json=None):
+    url = get_anime_list_url_for_user(user_id, offset)
+    logger.debug('(Network) Retrieving anime list from "%s"', url)
+
+    if limiter is not None:
+        limiter.wait(url)
+
+    response = requester.get(url)
+    return _process_anime_list_response(user_id, response, from_json)
+
+
+def _process_anime_list_response(user_id, response, from_json=None):
+    """Return the anime from the response to a page of the user's list (may be empty).
+
+    The decoded JSON is processed by from_json, by default get_user_anime_list_from_json.
+    """
+    if response.status_code >= 400:  # Raise an exception
+        if response.status_code in (400, 401):
+            msg = 'Access to user "%s"\'s anime list is forbidden' % user_id
+            raise RequestError(RequestError.Code.forbidden, msg)
+        elif response.status_code == 404:
+            msg = 'User "%s" does not exist' % user_id
+            raise RequestError(RequestError.Code.does_not_exist, msg)
+
+        response.raise_for_status()  # Will raise
+
+    from_json = from_json or get_user_anime_list_from_json
+    return from_json(response.json())
 
 
 # --- URLs ---
@@ -197,6 +492,34 @@ def get_anime_list_url_for_user(user_id, offset=0):
 # --- Parse Profile Page ---
 
 
+def get_user_stats_from_html(html, parser=None, full_page=False, from_encoding=None):
+    """Return the user stats from the HTML of a user's profile page.
+
+    Args:
+        html (bytes or str): The web-page.
+        parser (str, optional): BeautifulSoup parser to use, e.g. 'lxml'.
+            See :mod:`mal_scraper.parsing`.
+        full_page (bool, optional): Build the soup for the whole page rather
+            than only the parts of the page that we use.
+        from_encoding (str, optional): The encoding of the (bytes) web-page,
+            e.g. from the response's Content-Type header. Defaults to the
+            one it declares, see :func:`mal_scraper.parsing.make_soup`.
+
+    Returns:
+        A data dictionary, see :func:`get_user_stats_from_soup`.
+
+    Raises:
+        ParseError: If any component of the page could not be processed
+            or was unexpected.
+    """
+    parse_only = None if full_page else _soup_strainer
+    return get_user_stats_from_soup(make_soup(html, parser, parse_only, from_encoding))
+
+
+# The name (h1), status (last online...) and stats are the only parts we use
+_soup_strainer = make_class_strainer('h1', 'user-status', 'stats-status')
+
+
 def get_user_stats_from_soup(soup):
     """Return the user stats from a soup of HTML.
 
@@ -1,10 +1,14 @@
 import os
+import sys
 import urllib.request
 from base64 import b64encode
 
 import pytest
 import responses
 
+# The asynchronous API uses async/await syntax (Python 3.5+)
+collect_ignore = ['test_aio.py'] if sys.version_info < (3, 5) else []
+
 
 class ResponsesWrapper:
     """Mock ALL requests more easily using saved files when use_live.
@@ -97,5 +101,15 @@ def mock_requests(request):
     mal_scraper.__init__._FORCE_HTTP = True
 
     use_live = bool(os.environ.get('LIVE_RESPONSES', False))
-    with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
-        yield ResponsesWrapper(rsps, use_live)
+
+    # Only limit the rate of live requests
+    from mal_scraper.requester import default_requester
+    limiter = default_requester.limiter
+    if not use_live:
+        default_requester.limiter = None
+
+    try:
+        with responses.RequestsMock(assert_all_requests_are_fired=True) as rsps:
+            yield ResponsesWrapper(rsps, use_live)
+    finally:
+        default_requester.limiter = limiter
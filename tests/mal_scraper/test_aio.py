@@ -0,0 +1,198 @@
+"""Can we use the asynchronous API?"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+import responses
+
+import mal_scraper
+from mal_scraper import aio
+from mal_scraper.cache import ResultCache
+from mal_scraper.consts import ResponseSummary
+from mal_scraper.ratelimit import RateLimiter
+from mal_scraper.records import AnimeRecord, UserStats
+
+
+class AsyncRequester:
+    """Make (mocked) requests through the Requests library, but asynchronously."""
+
+    def __init__(self):
+        self.urls = []
+
+    async def get(self, url):
+        self.urls.append(url)
+        await asyncio.sleep(0)
+        return requests.get(url)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_get_anime_async(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    mock_requests.optional_mock('http://myanimelist.net/anime/5')
+
+    async def get_both():
+        requester = aio.BoundedRequester(AsyncRequester(), limit=1, limiter=None)
+        return await asyncio.gather(
+            aio.get_anime_async(1, requester),
+            aio.get_anime_async(5, requester, executor=ThreadPoolExecutor(1)),
+        )
+
+    first, fifth = run(get_both())
+    assert first.meta['id_ref'] == 1
+    assert first.data['name'] == 'Cowboy Bebop'
+    assert fifth.data['format'] == mal_scraper.Format.film
+
+
+def test_bounded_requester_limits_the_rate(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    limiter = RateLimiter(rate=20, burst=1)
+
+    async def get_twice():
+        requester = aio.BoundedRequester(AsyncRequester(), limit=2, limiter=limiter)
+        return await asyncio.gather(
+            aio.get_anime_async(1, requester), aio.get_anime_async(1, requester),
+        )
+
+    start = time.monotonic()
+    run(get_twice())
+    assert time.monotonic() - start >= 0.05
+
+
+def test_bounded_requester_retries_throttled_responses(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(responses.GET, url, status=429, headers={'Retry-After': '0.1'})
+    mock_requests.optional_mock(url)
+    limiter = RateLimiter(rate=100, burst=1, slowdown=0.5, recovery=1)
+
+    requester = aio.BoundedRequester(AsyncRequester(), limit=1, limiter=limiter)
+    start = time.monotonic()
+    result = run(aio.get_anime_async(1, requester))
+
+    assert result.data['name'] == 'Cowboy Bebop'
+    assert len(mock_requests.rsps.calls) == 2
+    assert limiter.get_bucket(url).rate == 50  # Slowed down
+    assert time.monotonic() - start >= 0.1  # Paused for the Retry-After
+
+
+def test_bounded_requester_returns_throttled_responses_after_the_retries(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(responses.GET, url, status=503)
+
+    requester = aio.BoundedRequester(
+        AsyncRequester(), limit=1, limiter=None, max_retries=2, backoff_factor=0,
+    )
+    assert run(requester.get(url)).status_code == 503
+    assert len(mock_requests.rsps.calls) == 3
+
+
+def test_bounded_requester_shares_the_default_limiter():
+    requester = aio.BoundedRequester(AsyncRequester(), limit=1)
+    assert requester.limiter is mal_scraper.requester.default_limiter
+
+
+def test_bounded_requester_rejects_blocking_limiters():
+    class BlockingLimiter:
+        def wait(self, url):
+            pass
+
+    with pytest.raises(TypeError):
+        aio.BoundedRequester(AsyncRequester(), limit=1, limiter=BlockingLimiter())
+
+
+def test_get_anime_async_takes_the_options_of_get_anime(mock_requests, monkeypatch):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    result_cache = ResultCache()
+
+    def get_anime():
+        return run(aio.get_anime_async(
+            1, AsyncRequester(), result_cache=result_cache, record_type=AnimeRecord,
+            meta_policy='summary',
+        ))
+
+    first = get_anime()
+    assert isinstance(first.data, AnimeRecord)
+    assert isinstance(first.meta['response'], ResponseSummary)
+
+    def parse(*args, **kwargs):
+        raise AssertionError('The page should not be parsed again')
+
+    monkeypatch.setattr(mal_scraper.anime, 'get_anime_from_html', parse)
+    assert get_anime().data == first.data
+
+
+def test_get_user_stats_async(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/profile/SparkleBunnies', 'user_test_page')
+    mock_requests.always_mock(
+        'http://myanimelist.net/profile/asdghiuhunircg', 'user_does_not_exist', status=404,
+    )
+
+    data = run(aio.get_user_stats_async('SparkleBunnies', AsyncRequester())).data
+    assert data['num_anime_completed'] == 129
+
+    stats = run(aio.get_user_stats_async(
+        'SparkleBunnies', AsyncRequester(), record_type=UserStats, meta_policy='none',
+    ))
+    assert isinstance(stats.data, UserStats)
+    assert stats.data.num_anime_completed == 129
+    assert 'response' not in stats.meta
+
+    with pytest.raises(mal_scraper.RequestError) as err:
+        run(aio.get_user_stats_async('asdghiuhunircg', AsyncRequester()))
+    assert err.value.code == mal_scraper.RequestError.Code.does_not_exist
+
+
+def test_get_user_anime_list_async(mock_requests):
+    list_url = 'http://myanimelist.net/animelist/Littoface/load.json?offset={:d}&status=7'
+    mock_requests.always_mock(list_url.format(0), 'user_anime_list_small')
+    mock_requests.always_mock(list_url.format(158), 'user_anime_list_end')
+
+    anime = run(aio.get_user_anime_list_async('Littoface', AsyncRequester()))
+    assert len(anime) == 158
+    assert anime[0]['id_ref'] == 11843
+
+
+def test_discover_users_async(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/users.php', 'users_discovery')
+
+    users = run(aio.discover_users_async(AsyncRequester(), use_cache=False, use_web=True))
+    assert len(users) == 20
+
+
+def test_aiohttp_requester(mock_requests):
+    class FakeAiohttpResponse:
+        status = 200
+        reason = 'OK'
+        url = 'http://myanimelist.net/anime/1'
+        headers = {'Content-Type': 'text/html; charset=utf-8'}
+        charset = 'utf-8'
+
+        async def read(self):
+            return b'<html>Hello</html>'
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            pass
+
+    class FakeAiohttpSession:
+        def get(self, url):
+            return FakeAiohttpResponse()
+
+    requester = aio.AiohttpRequester(FakeAiohttpSession())
+    response = run(requester.get('http://myanimelist.net/anime/1'))
+
+    assert response.status_code == 200
+    assert response.text == '<html>Hello</html>'
+    assert response.headers['content-type'] == 'text/html; charset=utf-8'
+    response.raise_for_status()
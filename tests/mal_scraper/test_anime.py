@@ -1,8 +1,11 @@
 """Can we download anime metadata?"""
 
+import hashlib
 from datetime import date, datetime, timedelta
 
 import pytest
+import requests
+from bs4 import BeautifulSoup
 
 import mal_scraper
 
@@ -124,3 +127,164 @@ def test_user_discovery_on_anime_page(mock_requests):
         'TheCriticsClub', 'TheCriticsClub', 'ElectricSlime', 'Mana', 'Scribbly',
         'Legg91', 'Metty', 'Darius', 'tokaicentral85', 'Ai_Sakura',
     ]
+
+
+def test_sidebar_labels_are_indexed(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    response = mal_scraper.get_anime(1).meta['response']
+    soup = BeautifulSoup(response.content, 'html.parser')
+
+    labels = mal_scraper.anime._get_sidebar_labels(soup)
+    assert labels.keys() >= {
+        'English:', 'Type:', 'Episodes:', 'Status:', 'Aired:', 'Premiered:', 'Rating:',
+        'Score:', 'Ranked:', 'Popularity:', 'Members:', 'Favorites:',
+    }
+    assert labels['Aired:'].next_sibling.strip() == 'Apr 3, 1998 to Apr 24, 1999'
+
+
+def test_sidebar_labels_fall_back_to_the_whole_page():
+    soup = BeautifulSoup('<div><span class="dark_text">Type:</span> TV</div>', 'html.parser')
+    assert list(mal_scraper.anime._get_sidebar_labels(soup)) == ['Type:']
+
+
+@pytest.mark.parametrize('id_ref', [1, 5, 15, 44, 574, 730, 1190, 3624, 3642])
+def test_fast_path_matches_the_soup(mock_requests, id_ref):
+    mock_requests.optional_mock('http://myanimelist.net/anime/%d' % id_ref)
+    content = mal_scraper.get_anime(id_ref).meta['response'].content
+
+    assert mal_scraper.anime.get_anime_fast_path_differences(content) == {}
+    assert mal_scraper.anime.get_anime_from_html(content, fast_path=True) == \
+        mal_scraper.anime.get_anime_from_html(content)
+
+
+def test_fast_path_falls_back_to_the_soup(mock_requests, caplog):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    content = mal_scraper.get_anime(1).meta['response'].content
+    content = content.replace(b'<span itemprop="name">', b'<span class="x" itemprop="name">')
+
+    differences = mal_scraper.anime.get_anime_fast_path_differences(content)
+    assert list(differences) == ['name']
+    assert isinstance(differences['name'][0], mal_scraper.ParseError)
+    assert differences['name'][1] == 'Cowboy Bebop'
+
+    data = mal_scraper.anime.get_anime_from_html(content, fast_path=True)
+    assert data['name'] == 'Cowboy Bebop'
+
+    assert mal_scraper.anime.get_anime_from_html(content, fast_path='verify') == data
+    assert 'Fast path differs' in caplog.text
+
+
+def test_fast_path_is_only_taken_for_utf8(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    content = mal_scraper.get_anime(1).meta['response'].content
+    content = content.replace(b'Cowboy Bebop</span>', 'Cowboy Bébop</span>'.encode('utf-8'))
+
+    assert mal_scraper.anime.get_anime_from_html(
+        content, fast_path=True, from_encoding='UTF8',
+    )['name'] == 'Cowboy Bébop'
+
+    # (The UTF-8 bytes of é are also valid latin-1, as Ã©)
+    assert mal_scraper.anime.get_anime_from_html(
+        content, fast_path=True, from_encoding='latin-1',
+    )['name'] == 'Cowboy BÃ©bop'
+
+
+def test_fast_path_on_a_bad_page_raises_an_error(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/anime/1', 'garbled_anime_page')
+    with pytest.raises(mal_scraper.ParseError):
+        mal_scraper.get_anime(1, fast_path=True)
+
+
+def test_anime_does_not_exist(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/anime/2', 'anime_does_not_exist', status=404)
+
+    with pytest.raises(mal_scraper.RequestError) as err:
+        mal_scraper.get_anime(2)
+    assert err.value.code == mal_scraper.RequestError.Code.does_not_exist
+
+
+class TestGetAnimeMany:
+
+    def mock(self, mock_requests):
+        mock_requests.optional_mock('http://myanimelist.net/anime/1')
+        mock_requests.always_mock(
+            'http://myanimelist.net/anime/2', 'anime_does_not_exist', status=404,
+        )
+        mock_requests.always_mock('http://myanimelist.net/anime/3', 'garbled_anime_page')
+        mock_requests.optional_mock('http://myanimelist.net/anime/5')
+
+    def test_results_and_errors_in_order(self, mock_requests):
+        self.mock(mock_requests)
+
+        results = list(mal_scraper.get_anime_many([1, 2, 3, 5], concurrency=2))
+        assert [result.meta['id_ref'] for result in results] == [1, 2, 3, 5]
+
+        first, missing, garbled, fifth = results
+        assert isinstance(first, mal_scraper.Retrieved)
+        assert first.data['name'] == 'Cowboy Bebop'
+        assert fifth.data['format'] == mal_scraper.Format.film
+
+        assert isinstance(missing, mal_scraper.Failed)
+        assert missing.error.code == mal_scraper.RequestError.Code.does_not_exist
+
+        assert isinstance(garbled, mal_scraper.Failed)
+        assert isinstance(garbled.error, mal_scraper.ParseError)
+        assert garbled.error.tag == 'name'
+
+    def test_unordered(self, mock_requests):
+        self.mock(mock_requests)
+
+        results = mal_scraper.get_anime_many(iter([1, 2, 3, 5]), concurrency=3, ordered=False)
+        assert sorted(result.meta['id_ref'] for result in results) == [1, 2, 3, 5]
+
+    def test_parsing_in_processes_matches_threads(self, mock_requests):
+        self.mock(mock_requests)
+        in_threads = list(mal_scraper.get_anime_many([1, 2, 3, 5], concurrency=2))
+        in_processes = list(mal_scraper.get_anime_many(
+            [1, 2, 3, 5], concurrency=2, processes=2, chunksize=2,
+        ))
+
+        assert [type(result) for result in in_processes] == [type(r) for r in in_threads]
+        assert in_processes[0].data == in_threads[0].data
+        assert in_processes[3].data == in_threads[3].data
+
+        # Enums and dates survive the trip between processes intact
+        assert in_processes[0].data['airing_status'] is mal_scraper.AiringStatus.finished
+        assert in_processes[0].data['airing_started'] == in_threads[0].data['airing_started']
+        assert in_processes[0].meta['response'].status_code == 200
+
+        assert in_processes[1].error.code == mal_scraper.RequestError.Code.does_not_exist
+        assert isinstance(in_processes[2].error, mal_scraper.ParseError)
+        assert in_processes[2].error.tag == 'name'
+
+
+class TestMetaPolicy:
+
+    def test_full_by_default(self, mock_requests):
+        mock_requests.optional_mock('http://myanimelist.net/anime/1')
+        meta = mal_scraper.get_anime(1).meta
+        assert isinstance(meta['response'], requests.Response)
+
+    def test_summary_by_default_in_bulk(self, mock_requests):
+        mock_requests.optional_mock('http://myanimelist.net/anime/1')
+        full = mal_scraper.get_anime(1).meta['response']
+        meta = next(mal_scraper.get_anime_many([1])).meta
+
+        summary = meta['response']
+        assert isinstance(summary, mal_scraper.ResponseSummary)
+        assert summary.url == 'http://myanimelist.net/anime/1'
+        assert summary.status_code == 200
+        assert summary.content_length == len(full.content)
+        assert summary.content_hash == hashlib.sha256(full.content).hexdigest()
+        assert not summary.from_cache
+        assert meta['id_ref'] == 1
+
+    def test_none(self, mock_requests):
+        mock_requests.optional_mock('http://myanimelist.net/anime/1')
+        meta = mal_scraper.get_anime(1, meta_policy='none').meta
+        assert meta.keys() == {'id_ref', 'when'}
+
+    def test_unknown(self, mock_requests):
+        mock_requests.optional_mock('http://myanimelist.net/anime/1')
+        with pytest.raises(ValueError):
+            mal_scraper.get_anime(1, meta_policy='some')
@@ -0,0 +1,52 @@
+import pytest
+
+from mal_scraper.bloom import BloomFilter
+
+
+def test_bloom_filter_remembers_strings():
+    bloom = BloomFilter(1000)
+
+    assert bloom.add('TheLlama') is True
+    assert bloom.add('TheLlama') is False
+    assert 'TheLlama' in bloom
+    assert 'Polyphemus' not in bloom
+    assert len(bloom) == 1
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(10000, error_rate=0.01)
+    for i in range(10000):
+        bloom.add('user%d' % i)
+
+    assert all('user%d' % i in bloom for i in range(10000))
+    false_positives = sum('other%d' % i in bloom for i in range(10000))
+    assert false_positives < 200  # ~1%
+
+
+def test_bloom_filter_save_and_load(tmpdir):
+    path = str(tmpdir.join('seen.bloom'))
+    bloom = BloomFilter(1000)
+    bloom.add('TheLlama')
+    bloom.save(path)
+
+    loaded = BloomFilter.load(path)
+    assert (loaded.num_bits, loaded.num_hashes, len(loaded)) == (
+        bloom.num_bits, bloom.num_hashes, 1,
+    )
+    assert 'TheLlama' in loaded
+    assert loaded.add('Polyphemus')
+    loaded.save(path)  # Over the mapped file
+    loaded.close()
+
+    reloaded = BloomFilter.load(path)
+    assert 'TheLlama' in reloaded and 'Polyphemus' in reloaded
+    assert len(reloaded) == 2
+    reloaded.close()
+
+
+def test_bloom_filter_load_rejects_other_files(tmpdir):
+    path = tmpdir.join('other.bloom')
+    path.write_binary(b'Not a Bloom filter at all, but long enough')
+
+    with pytest.raises(ValueError):
+        BloomFilter.load(str(path))
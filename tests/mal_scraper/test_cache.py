@@ -0,0 +1,203 @@
+import pytest
+import responses
+
+import mal_scraper
+from mal_scraper.cache import (
+    CachingRequester, DiskResultStore, MemoryResultStore, ResponseCache, ResultCache,
+    get_url_family,
+)
+from mal_scraper.requester import SessionRequester
+
+ANIME_URL = 'http://myanimelist.net/anime/1'
+
+
+def test_url_families():
+    assert get_url_family('https://myanimelist.net/anime/1') == 'anime'
+    assert get_url_family('https://myanimelist.net/profile/Bob') == 'profile'
+    assert get_url_family(
+        'https://myanimelist.net/animelist/Bob/load.json?offset=0&status=7'
+    ) == 'anime_list'
+    assert get_url_family('https://myanimelist.net/users.php') == 'other'
+
+
+def test_a_fresh_response_skips_the_network(mock_requests):
+    mock_requests.optional_mock(ANIME_URL)
+    requester = CachingRequester(ResponseCache(), SessionRequester())
+
+    first = mal_scraper.get_anime(1, requester=requester)
+    second = mal_scraper.get_anime(1, requester=requester)
+
+    assert len(mock_requests.rsps.calls) == 1
+    assert not first.meta['response'].from_cache
+    assert second.meta['response'].from_cache
+    assert second.data == first.data
+
+
+def test_responses_are_stored_compressed(mock_requests):
+    mock_requests.optional_mock(ANIME_URL)
+    cache = ResponseCache()
+    response = CachingRequester(cache, SessionRequester()).get(ANIME_URL)
+
+    assert len(cache) == 1
+    assert 0 < cache.size() < len(response.content) / 2
+    assert cache.get(ANIME_URL).content == response.content
+
+
+def test_a_stale_response_is_revalidated(mock_requests):
+    mock_requests.rsps.add(
+        responses.GET, ANIME_URL, body=b'<html>Old</html>', headers={'ETag': '"v1"'},
+    )
+    mock_requests.rsps.add(responses.GET, ANIME_URL, status=304)
+
+    requester = CachingRequester(ResponseCache(ttls={'anime': 0}), SessionRequester())
+    requester.get(ANIME_URL)
+    response = requester.get(ANIME_URL)
+
+    assert mock_requests.rsps.calls[1].request.headers['If-None-Match'] == '"v1"'
+    assert response.from_cache
+    assert response.content == b'<html>Old</html>'
+
+
+def test_a_stale_response_is_replaced(mock_requests):
+    mock_requests.rsps.add(
+        responses.GET, ANIME_URL, body=b'Old', headers={'Last-Modified': 'Mon, 1 May 2017'},
+    )
+    mock_requests.rsps.add(responses.GET, ANIME_URL, body=b'New')
+
+    cache = ResponseCache(ttls={'anime': 0})
+    requester = CachingRequester(cache, SessionRequester())
+    requester.get(ANIME_URL)
+    response = requester.get(ANIME_URL)
+
+    assert mock_requests.rsps.calls[1].request.headers['If-Modified-Since'] == 'Mon, 1 May 2017'
+    assert not response.from_cache
+    assert cache.get(ANIME_URL).content == b'New'
+
+
+def test_errors_are_not_cached(mock_requests):
+    mock_requests.always_mock(
+        'http://myanimelist.net/anime/2', 'anime_does_not_exist', status=404,
+    )
+    cache = ResponseCache()
+    CachingRequester(cache, SessionRequester()).get('http://myanimelist.net/anime/2')
+
+    assert len(cache) == 0
+
+
+def test_the_least_recently_used_responses_are_evicted():
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def __init__(self, content):
+            self.content = content
+
+    cache = ResponseCache(max_size=250, compress_level=0)
+    cache.store('http://a', Response(b'a' * 100))
+    cache.store('http://b', Response(b'b' * 100))
+    cache.get('http://a')  # Now b is the least recently used
+    cache.store('http://c', Response(b'c' * 100))
+
+    assert cache.get('http://a') is not None
+    assert cache.get('http://b') is None
+    assert cache.get('http://c') is not None
+    assert cache.size() <= 250
+
+
+def test_response_cache_keeps_a_running_size_and_reads_do_not_write(tmpdir):
+    class Response:
+        status_code = 200
+        headers = {}
+
+        def __init__(self, content):
+            self.content = content
+
+    path = str(tmpdir.join('responses.sqlite'))
+    cache = ResponseCache(path, compress_level=0)
+    cache.store('http://a', Response(b'a' * 100))
+    cache.store('http://b', Response(b'b' * 100))
+    size = cache.size()
+    cache.store('http://a', Response(b'a' * 200))  # Replaced
+    assert cache.size() > size
+
+    changes = cache._connection.total_changes
+    assert cache.get('http://a') is not None
+    assert cache._connection.total_changes == changes
+
+    cache.delete('http://b')
+    size = cache.size()
+    cache.close()
+    assert ResponseCache(path).size() == size
+
+
+@pytest.mark.parametrize('store', [MemoryResultStore(), DiskResultStore()])
+def test_result_cache_is_keyed_by_content_and_version(store):
+    cache = ResultCache(store)
+    data = {'name': 'Cowboy Bebop', 'format': mal_scraper.Format.tv, 'tags': {'a'}}
+
+    cache.put('anime', 1, b'<html>', data)
+    assert cache.get('anime', 1, b'<html>') == data
+    assert cache.get('anime', 1, b'<html>') is not cache.get('anime', 1, b'<html>')
+    assert cache.get('anime', 2, b'<html>') is None
+    assert cache.get('anime', 1, b'<html>!') is None
+    assert cache.get('user_stats', 1, b'<html>') is None
+
+
+@pytest.mark.parametrize('store', [
+    MemoryResultStore(max_entries=2),
+    DiskResultStore(max_entries=2),
+])
+def test_result_stores_keep_the_most_recently_used(store):
+    store.put('a', b'1')
+    store.put('b', b'2')
+    store.get('a')
+    store.put('c', b'3')
+
+    assert len(store) == 2
+    assert store.get('a') == b'1'
+    assert store.get('b') is None
+
+
+def test_disk_result_store_evicts_in_batches_and_reads_do_not_write(tmpdir):
+    path = str(tmpdir.join('results.sqlite'))
+    store = DiskResultStore(path, max_entries=10, evict_fraction=0.2)
+    for i in range(10):
+        store.put(str(i), b'data')
+
+    changes = store._connection.total_changes
+    assert store.get('0') == b'data'
+    assert store._connection.total_changes == changes
+
+    store.put('10', b'data')  # One too many
+    assert len(store) == 8
+    assert store.get('0') == b'data'  # It was used recently
+    assert store.get('1') is None
+    store.close()
+
+    assert len(DiskResultStore(path, max_entries=10)) == 8
+
+
+def test_get_anime_reuses_parsed_results(mock_requests, monkeypatch):
+    mock_requests.optional_mock(ANIME_URL)
+    result_cache = ResultCache()
+    first = mal_scraper.get_anime(1, requester=SessionRequester(), result_cache=result_cache)
+
+    def parse(*args, **kwargs):
+        raise AssertionError('The page should not be parsed again')
+
+    monkeypatch.setattr(mal_scraper.anime, 'get_anime_from_html', parse)
+    second = mal_scraper.get_anime(1, requester=SessionRequester(), result_cache=result_cache)
+    assert second.data == first.data
+
+
+def test_get_anime_many_reuses_parsed_results_from_processes(mock_requests):
+    mock_requests.optional_mock(ANIME_URL)
+    mock_requests.optional_mock('http://myanimelist.net/anime/5')
+    result_cache = ResultCache()
+
+    first = list(mal_scraper.get_anime_many([1, 5], processes=2, result_cache=result_cache))
+    assert len(result_cache.store) == 2
+
+    second = list(mal_scraper.get_anime_many([1, 5], processes=2, result_cache=result_cache))
+    assert [result.data for result in second] == [result.data for result in first]
+    assert len(result_cache.store) == 2
@@ -0,0 +1,79 @@
+import pytest
+
+import mal_scraper
+from mal_scraper.columnar import AnimeListColumns, AnimeListRow
+
+LIST_URL = 'http://myanimelist.net/animelist/Littoface/load.json?offset={:d}&status=7'
+
+
+@pytest.fixture
+def columns(mock_requests):
+    mock_requests.always_mock(LIST_URL.format(0), 'user_anime_list_small')
+    mock_requests.always_mock(LIST_URL.format(158), 'user_anime_list_end')
+
+    columns = AnimeListColumns()
+    assert columns.append_user_anime_list('Littoface', limiter=None) == 158
+    return columns
+
+
+def test_append_from_json_pages_matches_the_dicts(columns):
+    anime = mal_scraper.get_user_anime_list('Littoface', limiter=None)
+
+    assert len(columns) == 158
+    assert columns[0] == AnimeListRow(
+        'Littoface', 11843, mal_scraper.ConsumptionStatus.consuming, 0, 9, False,
+    )
+    assert [row.id_ref for row in columns] == [entry['id_ref'] for entry in anime]
+    assert [row.consumption_status for row in columns] == [
+        entry['consumption_status'] for entry in anime
+    ]
+
+
+def test_append_dicts(columns):
+    other = AnimeListColumns()
+    for row in columns:
+        other.append(row.user_id, row._asdict())
+
+    assert list(other) == list(columns)
+    assert other.columns['consumption_status'] == columns.columns['consumption_status']
+
+
+def test_users_are_stored_once(columns):
+    columns.append('Someone', {
+        'id_ref': 1, 'consumption_status': mal_scraper.ConsumptionStatus.backlog,
+        'score': 0, 'progress': 0, 'is_rewatch': False,
+    })
+
+    assert columns.user_ids == ['Littoface', 'Someone']
+    assert columns[-1].user_id == 'Someone'
+    assert columns.columns['user_index'].itemsize == 4
+
+
+def test_rows_which_do_not_fit_are_not_appended(columns):
+    with pytest.raises(OverflowError):
+        columns.append('Littoface', {
+            'id_ref': 1, 'consumption_status': mal_scraper.ConsumptionStatus.backlog,
+            'score': 1000, 'progress': 0, 'is_rewatch': False,
+        })
+
+    assert len(columns) == 158
+    assert set(len(column) for column in columns.columns.values()) == {158}
+
+
+def test_to_numpy_shares_memory(columns):
+    numpy = pytest.importorskip('numpy')
+    arrays = columns.to_numpy()
+
+    assert arrays['id_ref'].dtype == numpy.int32
+    assert arrays['score'].dtype == numpy.int8
+    assert list(arrays['progress']) == list(columns.columns['progress'])
+    assert not arrays['progress'].flags.owndata
+
+
+def test_to_arrow(columns):
+    pytest.importorskip('pyarrow')
+    table = columns.to_arrow()
+
+    assert table.num_rows == 158
+    assert table.column_names[0] == 'user_id'
+    assert table.column('id_ref').to_pylist() == list(columns.columns['id_ref'])
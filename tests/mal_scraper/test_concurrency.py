@@ -0,0 +1,99 @@
+import pickle
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import mal_scraper
+from mal_scraper.concurrency import map_concurrently, map_in_processes
+
+
+def test_map_concurrently_in_order():
+    results = map_concurrently(lambda x: x * 2, range(10), concurrency=3)
+    assert [(item, future.result()) for item, future in results] == [
+        (x, x * 2) for x in range(10)
+    ]
+
+
+def test_map_concurrently_unordered_yields_as_completed():
+    def slow_first(x):
+        time.sleep(0.2 if x == 0 else 0)
+        return x
+
+    items = [item for item, future in map_concurrently(slow_first, range(4), 4, ordered=False)]
+    assert sorted(items) == [0, 1, 2, 3]
+    assert items[-1] == 0
+
+
+def test_map_concurrently_bounds_the_work_in_flight():
+    lock = threading.Lock()
+    in_flight = [0, 0]  # now, max
+
+    def work(x):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+
+    consumed = []
+
+    def items():
+        for x in range(20):
+            consumed.append(x)
+            yield x
+
+    results = map_concurrently(work, items(), concurrency=3)
+    next(results)
+    assert len(consumed) <= 4  # Lazily consumed
+
+    list(results)
+    assert in_flight[1] <= 3
+
+
+def test_map_concurrently_keeps_errors_in_futures():
+    def fail_odd(x):
+        if x % 2:
+            raise ValueError(x)
+        return x
+
+    errors = [
+        future.exception() for item, future in map_concurrently(fail_odd, range(4), 2)
+    ]
+    assert [error and error.args for error in errors] == [None, (1,), None, (3,)]
+
+
+def test_map_concurrently_needs_some_concurrency():
+    with pytest.raises(ValueError):
+        list(map_concurrently(str, range(4), 0))
+
+
+def test_map_in_processes_keeps_keys_and_errors():
+    pairs = [(key, arg) for key, arg in enumerate(['1', 'x', '3', '4', '5'])]
+    results = list(map_in_processes(int, pairs, processes=2, chunksize=2))
+
+    assert [(key, result) for key, result, error in results] == [
+        (0, 1), (1, None), (2, 3), (3, 4), (4, 5),
+    ]
+    assert isinstance(results[1][2], ValueError)
+
+
+@pytest.mark.parametrize('value', [
+    mal_scraper.Format.tv,
+    mal_scraper.Season.spring,
+    date(2017, 1, 2),
+])
+def test_values_survive_pickling(value):
+    assert pickle.loads(pickle.dumps(value)) == value
+
+
+@pytest.mark.parametrize('error', [
+    mal_scraper.RequestError(mal_scraper.RequestError.Code.forbidden, 'Message'),
+    mal_scraper.ParseError('Message', 'tag'),
+])
+def test_errors_survive_pickling(error):
+    copy = pickle.loads(pickle.dumps(error))
+    assert type(copy) is type(error)
+    assert vars(copy) == vars(error)
@@ -0,0 +1,47 @@
+import mal_scraper
+from mal_scraper.crawler import UserCrawlState, crawl_users
+
+PROFILE_URL = 'http://myanimelist.net/profile/%s'
+
+
+def test_crawl_queues_the_linked_users_and_resumes(mock_requests, tmpdir):
+    mock_requests.always_mock(PROFILE_URL % 'SparkleBunnies', 'user_test_page')
+    path = str(tmpdir.join('crawl.sqlite'))
+    state = UserCrawlState(path)
+
+    results = list(crawl_users(['SparkleBunnies'], state, max_depth=1, max_users=1))
+    assert [result.meta['user_id'] for result in results] == ['SparkleBunnies']
+    assert isinstance(results[0], mal_scraper.Retrieved)
+    assert state.count('done') == 1
+    assert state.count('queued') == 21  # The linked users (except SparkleBunnies)
+    state.close()
+
+    state = UserCrawlState(path)  # Resume (e.g. after a crash)
+    [(next_user, depth)] = state.get_queued(1)
+    assert depth == 1
+    mock_requests.always_mock(PROFILE_URL % next_user, 'user_test_page', status=404)
+
+    results = list(crawl_users(['SparkleBunnies'], state, max_depth=1, max_users=2))
+    assert [result.meta['user_id'] for result in results] == [next_user]
+    assert isinstance(results[0], mal_scraper.Failed)
+    assert state.count('failed') == 1
+    assert state.count('queued') == 20
+    assert len(mock_requests.rsps.calls) == 2
+
+
+def test_crawl_does_not_queue_users_beyond_the_max_depth(mock_requests):
+    mock_requests.always_mock(PROFILE_URL % 'SparkleBunnies', 'user_test_page')
+    state = UserCrawlState()
+
+    results = list(crawl_users(['SparkleBunnies'], state, max_depth=0))
+    assert len(results) == 1
+    assert state.count() == state.count('done') == 1
+
+
+def test_crawl_state_ignores_users_which_were_seen():
+    state = UserCrawlState()
+    assert state.add(['Alice', 'Bob'], 0) == 2
+    state.record('Alice', 'done')
+    assert state.add(['Alice', 'Bob', 'Carol'], 1) == 1
+
+    assert state.get_queued(10) == [('Bob', 0), ('Carol', 1)]
@@ -0,0 +1,95 @@
+import pytest
+
+import mal_scraper
+from mal_scraper.jobs import JobQueue, RetryPolicy, run_job
+
+
+def test_run_job_resumes_exactly(mock_requests, tmpdir):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    mock_requests.always_mock(
+        'http://myanimelist.net/anime/2', 'anime_does_not_exist', status=404,
+    )
+    mock_requests.always_mock('http://myanimelist.net/anime/3', 'garbled_anime_page')
+    path = str(tmpdir.join('jobs.sqlite'))
+    queue = JobQueue(path)
+    assert queue.add([1, 2, 3]) == 3
+
+    results = run_job(queue, mal_scraper.get_anime, concurrency=1)
+    assert next(results).meta['id_ref'] == 1
+    failed = next(results)  # Anime 1 is now done
+    assert isinstance(failed, mal_scraper.Failed)
+    assert failed.meta['key'] == 2
+    results.close()  # Crash
+    queue.close()
+
+    queue = JobQueue(path)
+    assert queue.add([1, 2, 3]) == 0
+    policy = RetryPolicy(max_attempts=2, backoff=0)
+    results = list(run_job(queue, mal_scraper.get_anime, policy=policy))
+
+    assert [(result.meta['key'], result.meta['attempts']) for result in results] == [(3, 2)]
+    assert isinstance(results[0].error, mal_scraper.ParseError)
+    assert len(mock_requests.rsps.calls) == 4  # Anime 3 was retried once
+
+    assert queue.count('done') == 1
+    assert queue.count('failed') == 2
+    assert queue.get(2).error_code == mal_scraper.RequestError.Code.does_not_exist
+    assert queue.get(3).error_tag == results[0].error.tag
+    assert queue.get(3).attempts == 2
+
+
+def test_run_job_can_stop_while_items_back_off(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/anime/3', 'garbled_anime_page')
+    queue = JobQueue()
+    queue.add([3])
+
+    assert list(run_job(queue, mal_scraper.get_anime, wait=False)) == []
+    item = queue.get(3)
+    assert (item.state, item.attempts) == ('pending', 1)
+    assert item.next_attempt > 0
+
+
+def test_job_queue_recovers_items_in_flight():
+    queue = JobQueue()
+    queue.add(['Alice', 'Bob'])
+    assert queue.claim(1) == ['Alice']
+    assert queue.count('in_flight') == 1
+
+    queue.recover()
+    assert queue.count('pending') == 2
+
+
+def test_run_job_raises_unexpected_errors():
+    queue = JobQueue()
+    queue.add([1])
+
+    def fetch(key):
+        raise KeyError(key)
+
+    with pytest.raises(KeyError):
+        list(run_job(queue, fetch))
+    assert queue.get(1).state == 'in_flight'  # Retried by the next run
+
+
+def test_run_job_only_retrieves_the_items_in_flight_again():
+    queue = JobQueue()
+    queue.add(range(20))
+    fetched = []
+
+    def fetch(key):
+        fetched.append(key)
+        return key
+
+    results = run_job(queue, fetch, concurrency=3)
+    assert next(results) is not None
+    assert next(results) is not None  # The first result is now done
+    results.close()  # Crash
+
+    in_flight = queue.count('in_flight')
+    assert 1 <= in_flight <= 3
+    assert len(fetched) == 1 + in_flight
+
+    fetched.clear()
+    assert len(list(run_job(queue, fetch, concurrency=3))) == 19
+    assert len(fetched) == 19  # Only the items in flight were retrieved again
+    assert queue.count('done') == 20
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+import pytest
+import requests
+import responses
+
+import mal_scraper
+from mal_scraper import parsing
+
+
+def test_make_soup_uses_the_default_parser(monkeypatch):
+    monkeypatch.setattr(parsing, 'default_parser', 'html.parser')
+    soup = parsing.make_soup(b'<p>Hello</p>')
+    assert soup.builder.NAME == 'html.parser'
+    assert soup.p.string == 'Hello'
+
+
+def test_make_soup_falls_back_when_the_parser_is_missing():
+    soup = parsing.make_soup(b'<p>Hello</p>', parser='not-a-real-parser')
+    assert soup.builder.NAME == parsing.FALLBACK_PARSER
+    assert soup.p.string == 'Hello'
+
+
+def test_make_soup_decodes_bytes_by_the_declared_encoding():
+    html = '<meta charset="iso-8859-1"><p>Café</p>'.encode('iso-8859-1')
+    assert parsing.make_soup(html).p.string == 'Café'
+    assert parsing.make_soup('<p>Café</p>'.encode('utf-8')).p.string == 'Café'
+
+
+def test_get_declared_encoding():
+    page = b'<html><head><meta http-equiv="Content-Type" content="text/html; charset=EUC-JP">'
+    assert parsing.get_declared_encoding(page) == 'EUC-JP'
+    assert parsing.get_declared_encoding(page, 'text/html; charset=utf-8') == 'utf-8'
+    assert parsing.get_declared_encoding(b'<p>Hello</p>', 'text/html') == parsing.DEFAULT_ENCODING
+
+
+def test_the_content_type_header_gives_the_encoding():
+    response = requests.Response()
+    response.headers['Content-Type'] = 'text/html; charset=iso-8859-1'
+    response._content = '<meta charset="utf-8"><p>Ã©</p>'.encode('iso-8859-1')
+
+    encoding = parsing.get_response_encoding(response)
+    assert encoding == 'iso-8859-1'  # Rather than the <meta>
+    assert parsing.make_soup(response.content, from_encoding=encoding).p.string == 'Ã©'
+    assert parsing.make_soup(response.content).p.string == 'é'
+
+
+def test_the_content_type_header_is_used_to_parse(mock_requests, monkeypatch):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.optional_mock(url)
+    response = requests.get(url)
+    mock_requests.rsps.replace(  # (Not the default spelling of UTF-8)
+        responses.GET, url, body=response.content, content_type='text/html; charset=utf8',
+    )
+
+    encodings = []
+
+    def make_soup(markup, parser=None, parse_only=None, from_encoding=None):
+        encodings.append(from_encoding)
+        return parsing.make_soup(markup, parser, parse_only, from_encoding)
+
+    monkeypatch.setattr(mal_scraper.anime, 'make_soup', make_soup)
+    mal_scraper.get_anime(1)
+    list(mal_scraper.get_anime_many([1]))
+    assert encodings == ['utf8', 'utf8']
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_get_anime_is_the_same_with_any_parser(mock_requests, parser):
+    if parser != 'html.parser':
+        pytest.importorskip(parser)
+
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+
+    expected = mal_scraper.get_anime(1).data
+    assert mal_scraper.get_anime(1, parser=parser).data == expected
+
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml'])
+def test_get_user_stats_is_the_same_with_any_parser(mock_requests, parser):
+    if parser != 'html.parser':
+        pytest.importorskip(parser)
+
+    url = 'http://myanimelist.net/profile/SparkleBunnies'
+    mock_requests.always_mock(url, 'user_test_page')
+    mock_requests.always_mock(url, 'user_test_page')
+
+    expected = mal_scraper.get_user_stats('SparkleBunnies').data
+    data = mal_scraper.get_user_stats('SparkleBunnies', parser=parser).data
+    assert data.pop('last_online') - expected.pop('last_online') < timedelta(seconds=10)
+    assert data == expected
+
+
+def test_anime_page_is_parsed_partially(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    response = mal_scraper.get_anime(1).meta['response']
+
+    soup = parsing.make_soup(response.content, parse_only=mal_scraper.anime._soup_strainer)
+    assert [tag['class'] for tag in soup.contents] == [['h1'], ['js-scrollfix-bottom']]
+
+    data = mal_scraper.anime.get_anime_from_html(response.content)
+    assert data == mal_scraper.anime.get_anime_from_html(response.content, full_page=True)
+
+
+def test_profile_page_is_parsed_partially(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/profile/SparkleBunnies', 'user_test_page')
+    response = mal_scraper.get_user_stats('SparkleBunnies').meta['response']
+
+    soup = parsing.make_soup(response.content, parse_only=mal_scraper.users._soup_strainer)
+    assert soup.find('script') is None
+    assert soup.find(class_='stats-status')
+
+    data = mal_scraper.users.get_user_stats_from_html(response.content)
+    full_data = mal_scraper.users.get_user_stats_from_html(response.content, full_page=True)
+    assert data.pop('last_online') - full_data.pop('last_online') < timedelta(seconds=10)
+    assert data == full_data
@@ -0,0 +1,112 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from mal_scraper.ratelimit import IntervalLimiter, RateLimiter, TokenBucket, parse_retry_after
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_interval_limiter_spaces_out_requests():
+    limiter = IntervalLimiter(0.05)
+
+    start = time.monotonic()
+    limiter.wait()  # The first request does not wait
+    assert time.monotonic() - start < 0.05
+
+    limiter.wait()
+    limiter.wait()
+    assert time.monotonic() - start >= 0.1
+
+
+def test_interval_limiter_is_shared_between_threads():
+    limiter = IntervalLimiter(0.05)
+    threads = [threading.Thread(target=limiter.wait) for _ in range(4)]
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - start >= 0.15
+
+
+def test_token_bucket_allows_bursts():
+    bucket = TokenBucket(rate=10, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)  # Reserved in order
+
+
+def test_token_bucket_pause_spends_the_burst():
+    bucket = TokenBucket(rate=10, burst=3)
+    bucket.pause(1)
+
+    assert bucket.reserve() == pytest.approx(1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(1.1, abs=0.01)
+
+
+def test_interval_limiter_is_a_token_bucket():
+    limiter = IntervalLimiter(2)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(2, abs=0.01)
+
+
+def test_rate_limiter_has_a_bucket_per_host():
+    limiter = RateLimiter(rate=1, burst=1, per_host={'slow.net': (0.5, 1)})
+
+    assert limiter.reserve('https://myanimelist.net/anime/1') == 0
+    assert limiter.reserve('https://other.net/') == 0
+    assert limiter.reserve('https://myanimelist.net/anime/2') == pytest.approx(1, abs=0.01)
+
+    assert limiter.get_bucket('http://slow.net/page').rate == 0.5
+
+
+def test_rate_limiter_slows_down_and_recovers():
+    limiter = RateLimiter(rate=1, burst=1, slowdown=0.5, recovery=2)
+    url = 'https://myanimelist.net/anime/1'
+    bucket = limiter.get_bucket(url)
+
+    limiter.feedback(url, FakeResponse(429, {'Retry-After': '3'}))
+    assert bucket.rate == 0.5
+    assert limiter.reserve(url) == pytest.approx(3, abs=0.1)
+
+    limiter.feedback(url, FakeResponse(200))
+    assert bucket.rate == 1
+    limiter.feedback(url, FakeResponse(200))
+    assert bucket.rate == 1  # No faster than we started
+
+
+def test_rate_limiter_has_a_minimum_rate():
+    limiter = RateLimiter(rate=1, slowdown=0.1, min_rate=0.5)
+    url = 'https://myanimelist.net/anime/1'
+
+    limiter.feedback(url, FakeResponse(503))
+    assert limiter.get_bucket(url).rate == 0.5
+
+
+@pytest.mark.parametrize('value, seconds', [
+    (None, None),
+    ('', None),
+    ('120', 120),
+    ('-5', 0),
+    ('Sun, 06 Nov 1994 08:49:37 GMT', 0),  # In the past
+    ('soon', None),
+])
+def test_parse_retry_after(value, seconds):
+    assert parse_retry_after(value) == seconds
+
+
+def test_parse_retry_after_dates():
+    in_a_minute = datetime.now(timezone.utc) + timedelta(seconds=60)
+    seconds = parse_retry_after(format_datetime(in_a_minute, usegmt=True))
+    assert 55 < seconds <= 60
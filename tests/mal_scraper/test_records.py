@@ -0,0 +1,83 @@
+import pickle
+import sys
+
+import pytest
+
+import mal_scraper
+from mal_scraper.records import AnimeListEntry, AnimeRecord, UserStats, intern_tags, make_record
+
+LIST_URL = 'http://myanimelist.net/animelist/reltats/load.json?offset={:d}&status=7'
+
+
+def test_anime_record(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    data = mal_scraper.get_anime(1).data
+    record = mal_scraper.get_anime(1, record_type=AnimeRecord).data
+
+    assert isinstance(record, AnimeRecord)
+    assert record.to_dict() == data
+    assert record.name == record['name'] == 'Cowboy Bebop'
+    assert record[0] == 'Cowboy Bebop'
+    assert pickle.loads(pickle.dumps(record)) == record
+
+
+def test_anime_many_records(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    result, = mal_scraper.get_anime_many([1], record_type=AnimeRecord)
+    assert isinstance(result.data, AnimeRecord)
+
+
+def test_user_stats_record(mock_requests):
+    mock_requests.always_mock('http://myanimelist.net/profile/SparkleBunnies', 'user_test_page')
+    data = mal_scraper.get_user_stats('SparkleBunnies').data
+    record = mal_scraper.get_user_stats('SparkleBunnies', record_type=UserStats).data
+
+    assert record.to_dict().keys() == data.keys()
+    assert record.joined == data['joined']  # (last_online is relative to now)
+    assert record.num_anime_completed == 129
+
+
+def test_anime_list_entries(mock_requests):
+    mock_requests.always_mock(LIST_URL.format(0), 'user_anime_list_tags')
+    mock_requests.always_mock(LIST_URL.format(263), 'user_anime_list_tags_end')
+
+    anime = mal_scraper.get_user_anime_list('reltats', limiter=None)
+    entries = mal_scraper.get_user_anime_list('reltats', limiter=None, record_type=AnimeListEntry)
+
+    assert [entry.to_dict() for entry in entries] == anime
+    assert isinstance(entries[99].tags, frozenset)
+    assert entries[99]['tags'] == anime[99]['tags']
+
+    # Equal tags are shared
+    no_tags = [entry.tags for entry in entries if not entry.tags]
+    assert len(no_tags) > 1
+    assert all(tags is no_tags[0] for tags in no_tags)
+
+
+def test_records_are_smaller_than_dicts():
+    data = {
+        'name': 'Name', 'id_ref': 1, 'consumption_status': None, 'is_rewatch': False,
+        'score': 0, 'progress': 0, 'tags': set(),
+    }
+    entry = AnimeListEntry.from_dict(data)
+
+    assert not hasattr(entry, '__dict__')
+    assert sys.getsizeof(entry) + sys.getsizeof(entry.tags) < \
+        sys.getsizeof(data) + sys.getsizeof(data['tags'])
+
+
+def test_records_have_no_unknown_keys():
+    record = UserStats(*range(8))
+    for key in ('unknown', 'count', 'index', '_fields', '_asdict'):
+        with pytest.raises(KeyError):
+            record[key]
+
+
+def test_make_record():
+    data = {'a': 1}
+    assert make_record(None, data) is data
+    assert make_record(dict, data) is data
+
+
+def test_intern_tags():
+    assert intern_tags({'a', 'b'}) is intern_tags(['b', 'a'])
@@ -0,0 +1,117 @@
+import time
+
+import responses
+
+import mal_scraper
+from mal_scraper.ratelimit import RateLimiter
+from mal_scraper.requester import SessionRequester, default_requester
+
+
+def test_default_requester_is_a_session():
+    assert isinstance(default_requester, SessionRequester)
+    assert mal_scraper.requester.request_passthrough is default_requester
+
+
+def test_default_requester_is_rate_limited():
+    # (The tests remove the limiter from the default requester while mocking)
+    assert isinstance(mal_scraper.requester.default_limiter, RateLimiter)
+
+
+def test_session_requester_pools_and_retries():
+    requester = SessionRequester(pool_connections=2, pool_maxsize=20, max_retries=5)
+    adapter = requester.session.get_adapter('https://myanimelist.net/anime/1')
+
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 20
+    assert adapter.max_retries.total == 5
+    assert 500 in adapter.max_retries.status_forcelist
+    assert 404 not in adapter.max_retries.status_forcelist
+
+
+def test_session_requester_retries_throttling_itself():
+    # So that throttling is always seen by the limiter, however it is changed
+    requester = SessionRequester()
+    adapter = requester.session.get_adapter('https://myanimelist.net/anime/1')
+
+    assert 429 not in adapter.max_retries.status_forcelist
+    assert 503 not in adapter.max_retries.status_forcelist
+    assert not adapter.max_retries.respect_retry_after_header
+
+
+def test_session_requester_makes_requests(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+
+    with SessionRequester(timeout=5) as requester:
+        meta, data = mal_scraper.get_anime(1, requester=requester)
+
+    assert data['name'] == 'Cowboy Bebop'
+    assert meta['response'].ok
+
+
+def test_session_requester_waits_on_and_informs_the_limiter(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+
+    class RecordingLimiter:
+        def __init__(self):
+            self.calls = []
+
+        def wait(self, url):
+            self.calls.append(('wait', url))
+
+        def feedback(self, url, response):
+            self.calls.append(('feedback', response.status_code))
+
+    limiter = RecordingLimiter()
+    mal_scraper.get_anime(1, requester=SessionRequester(limiter=limiter))
+    assert limiter.calls == [('wait', 'http://myanimelist.net/anime/1'), ('feedback', 200)]
+
+
+def test_throttled_responses_slow_down_and_pause_the_limiter(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(
+        responses.GET, url, status=429, headers={'Retry-After': '0.2'},
+    )
+    mock_requests.rsps.add(responses.GET, url, body='OK')
+    limiter = RateLimiter(rate=100, burst=1, slowdown=0.5, recovery=1)
+
+    start = time.monotonic()
+    response = SessionRequester(limiter=limiter).get(url)
+
+    assert response.status_code == 200
+    assert len(mock_requests.rsps.calls) == 2
+    assert limiter.get_bucket(url).rate == 50  # Slowed down
+    assert time.monotonic() - start >= 0.2  # Paused for the Retry-After
+
+
+def test_throttled_responses_are_retried_without_a_limiter(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(responses.GET, url, status=503, headers={'Retry-After': '0'})
+    mock_requests.rsps.add(responses.GET, url, body='OK')
+
+    requester = SessionRequester(limiter=RateLimiter())
+    requester.limiter = None
+
+    assert requester.get(url).status_code == 200
+    assert len(mock_requests.rsps.calls) == 2
+
+
+def test_throttled_responses_reach_a_limiter_set_later(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(responses.GET, url, status=429, headers={'Retry-After': '0'})
+    mock_requests.rsps.add(responses.GET, url, body='OK')
+
+    requester = SessionRequester()
+    requester.limiter = limiter = RateLimiter(rate=100, burst=1, slowdown=0.5, recovery=1)
+
+    assert requester.get(url).status_code == 200
+    assert len(mock_requests.rsps.calls) == 2
+    assert limiter.get_bucket(url).rate == 50
+
+
+def test_throttled_responses_are_returned_after_the_retries(mock_requests):
+    url = 'http://myanimelist.net/anime/1'
+    mock_requests.rsps.add(responses.GET, url, status=429)
+
+    requester = SessionRequester(max_retries=2, backoff_factor=0)
+    assert requester.get(url).status_code == 429
+    assert len(mock_requests.rsps.calls) == 3
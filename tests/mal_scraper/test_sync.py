@@ -0,0 +1,98 @@
+from datetime import date
+
+import mal_scraper
+from mal_scraper.sync import DAY, AnimeSyncState, RefreshPolicy, get_fingerprint, sync_anime
+
+NOW = 1500000000.0
+
+
+def make_retrieved(id_ref, airing_status=mal_scraper.AiringStatus.finished, members=1):
+    data = {
+        'name': 'Anime #%d' % id_ref,
+        'airing_status': airing_status,
+        'airing_started': date(2017, 1, 1),
+        'mal_members': members,
+    }
+    return mal_scraper.Retrieved({'id_ref': id_ref}, data)
+
+
+def test_sync_only_retrieves_the_anime_which_are_due(mock_requests):
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+    mock_requests.always_mock(
+        'http://myanimelist.net/anime/2', 'anime_does_not_exist', status=404,
+    )
+    mock_requests.always_mock('http://myanimelist.net/anime/3', 'garbled_anime_page')
+    state = AnimeSyncState()
+
+    results = list(sync_anime([1, 2, 3], state, now=NOW))
+    assert sorted(result.meta['id_ref'] for result in results) == [1, 2, 3]
+    assert len(mock_requests.rsps.calls) == 3
+
+    assert state.get(1).last_status == 'ok'
+    assert state.get(1).airing_status == mal_scraper.AiringStatus.finished
+    assert state.get(2).last_status == 'missing'
+    assert state.get(3).last_status == 'failed'
+
+    # Tomorrow only the failure is retried (and it is still garbled)
+    results = list(sync_anime([1, 2, 3], state, now=NOW + DAY))
+    assert [result.meta['id_ref'] for result in results] == [3]
+    assert state.get_due([1, 2, 3], now=NOW + 31 * DAY) == [1, 3]
+    assert state.get_due([1, 2, 3], now=NOW + 91 * DAY) == [1, 2, 3]  # Unsuccessful last
+
+
+def test_airing_and_new_anime_are_prioritised():
+    state = AnimeSyncState()
+    state.record(make_retrieved(1, mal_scraper.AiringStatus.finished), now=NOW)
+    state.record(make_retrieved(2, mal_scraper.AiringStatus.ongoing), now=NOW)
+    state.record(make_retrieved(3, mal_scraper.AiringStatus.pre_air), now=NOW)
+
+    assert state.get_due(range(1, 5), now=NOW) == [4]
+    assert state.get_due(range(1, 5), now=NOW + 2 * DAY) == [2, 4]
+    assert state.get_due(range(1, 5), now=NOW + 100 * DAY) == [2, 3, 4, 1]
+
+
+def test_unchanged_finished_anime_back_off():
+    state = AnimeSyncState(policy=RefreshPolicy(backoff=2, max_interval=100 * DAY))
+
+    state.record(make_retrieved(1, members=1), now=NOW)
+    assert state.get(1).next_fetch == NOW + 30 * DAY
+
+    state.record(make_retrieved(1, members=2), now=NOW)  # Statistics are ignored
+    assert state.get(1).unchanged == 1
+    assert state.get(1).next_fetch == NOW + 60 * DAY
+
+    state.record(make_retrieved(1), now=NOW)
+    assert state.get(1).next_fetch == NOW + 100 * DAY
+
+    changed = make_retrieved(1)
+    changed.data['name'] = 'Renamed'
+    state.record(changed, now=NOW)
+    assert state.get(1).unchanged == 0
+    assert state.get(1).next_fetch == NOW + 30 * DAY
+
+
+def test_unchanged_airing_anime_do_not_back_off():
+    state = AnimeSyncState(policy=RefreshPolicy(backoff=2))
+
+    for _ in range(5):
+        state.record(make_retrieved(1, mal_scraper.AiringStatus.ongoing), now=NOW)
+        state.record(make_retrieved(2, mal_scraper.AiringStatus.pre_air), now=NOW)
+
+    assert state.get(1).unchanged == 4
+    assert state.get(1).next_fetch == NOW + 1 * DAY
+    assert state.get(2).next_fetch == NOW + 3 * DAY
+
+
+def test_fingerprints_ignore_statistics():
+    assert get_fingerprint(make_retrieved(1, members=1).data) == \
+        get_fingerprint(make_retrieved(1, members=5).data)
+    assert get_fingerprint(make_retrieved(1).data) != get_fingerprint(make_retrieved(2).data)
+
+
+def test_state_is_persisted(tmpdir):
+    path = str(tmpdir.join('sync.sqlite'))
+    state = AnimeSyncState(path)
+    state.record(make_retrieved(1), now=NOW)
+    state.close()
+
+    assert AnimeSyncState(path).get(1).last_fetched == NOW
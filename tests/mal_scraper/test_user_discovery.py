@@ -1,6 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
 import mal_scraper
+from mal_scraper.bloom import BloomFilter
+from mal_scraper.user_discovery import (
+    BloomUserStore, DiscoveryHook, MemoryUserStore, SQLiteUserStore, UserStore,
+    default_discovery_hook, discover_users_from_html,
+)
+
 
+@pytest.fixture(params=['sync', 'deferred'])
+def discovery_mode(request):
+    default_discovery_hook.set_mode(request.param)
+    yield request.param
+    default_discovery_hook.set_mode('disabled')
 
+
+@pytest.mark.usefixtures('discovery_mode')
 class TestAutomaticUserDicoveryIntegrationTest:
     """Can we discover users as we download pages?"""
 
@@ -30,3 +47,135 @@ class TestAutomaticUserDicoveryIntegrationTest:
             'Ichigo_Shiba', 'BlackFIFA19', 'AkitoKazuki', 'Speeku', 'no_good_name',
             'Kagami', 'BKZekken',
         }
+
+
+def test_discover_users_from_html_is_the_same_for_text_and_bytes():
+    html = (
+        '<a href="/profile/Alice">Alice</a> <a href=\'https://myanimelist.net/profile/Bob/\'>'
+        '<p>Ça</p><a href="/profile/Alice">'
+    )
+    assert list(discover_users_from_html(html)) == ['Alice', 'Bob', 'Alice']
+    assert list(discover_users_from_html(html.encode('utf-8'))) == ['Alice', 'Bob', 'Alice']
+
+
+def test_discover_users_from_html_only_finds_links():
+    html = (
+        b'<a HREF="HTTP://MyAnimeList.net/profile/Alice">'
+        b'<a href="/profile/Bob/reviews"><a href="https://example.com/profile/Carol">'
+        b'<div data-user="/profile/Dave"> /profile/Eve" <a href="/profile/Bob">'
+    )
+    assert list(discover_users_from_html(html)) == ['Alice', 'Bob', 'Bob']
+    assert list(discover_users_from_html(html, unique=True)) == ['Alice', 'Bob']
+
+
+def test_user_discovery_is_disabled_by_default(mock_requests):
+    mal_scraper.discover_users(use_web=False)  # Empty cache
+    mock_requests.optional_mock('http://myanimelist.net/anime/1')
+
+    mal_scraper.get_anime(1)
+
+    assert mal_scraper.discover_users(use_web=False) == set()
+
+
+@pytest.mark.parametrize('mode', ['sync', 'deferred'])
+def test_discovery_hook_stats(mode):
+    store = MemoryUserStore()
+    hook = DiscoveryHook(store, mode=mode)
+
+    hook.submit(b'<a href="/profile/Alice"></a><a href="/profile/Bob">')
+    hook.submit('<a href="/profile/Alice">')
+    hook.flush()
+
+    assert store.get_and_clear_cache() == {'Alice', 'Bob'}
+    stats = hook.get_stats()
+    assert stats.pages_submitted == stats.pages_scanned == 2
+    assert stats.users_found == 3
+    assert stats.pages_dropped == stats.queued == 0
+    assert stats.scan_seconds > 0
+
+
+def test_discovery_hook_drops_pages_when_the_queue_is_full():
+    hook = DiscoveryHook(MemoryUserStore(), max_queued=1)
+    hook._worker = object()  # Pretend there is a worker so that nothing is scanned
+    hook.set_mode('deferred')
+
+    hook.submit(b'<a href="/profile/Alice">')
+    hook.submit(b'<a href="/profile/Bob">')
+
+    stats = hook.get_stats()
+    assert (stats.pages_submitted, stats.pages_dropped, stats.queued) == (2, 1, 1)
+
+
+def test_discovery_hook_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        DiscoveryHook(MemoryUserStore(), mode='eventually')
+
+
+def test_memory_user_store_evicts_the_oldest_users():
+    store = MemoryUserStore(max_users=2)
+    store.store_users(['Alice', 'Bob'])
+    store.store_users(['Carol'])
+
+    assert store.evicted == 1
+    assert store.get_and_clear_cache() == {'Bob', 'Carol'}
+    assert store.get_and_clear_cache() == set()
+
+
+def test_memory_user_store_is_thread_safe():
+    store = MemoryUserStore()
+    batches = [['user%d_%d' % (batch, i) for i in range(100)] for batch in range(50)]
+    found = set()
+
+    def store_and_take(batch):
+        store.store_users(batch)
+        return store.get_and_clear_cache()
+
+    with ThreadPoolExecutor(8) as executor:
+        for users in executor.map(store_and_take, batches):
+            found |= users
+
+    found |= store.get_and_clear_cache()
+    assert len(found) == 50 * 100
+
+
+def test_sqlite_user_store_only_hands_out_new_users(tmpdir):
+    path = str(tmpdir.join('users.sqlite'))
+    store = SQLiteUserStore(path)
+    store.store_users_from_html(b'<a href="/profile/Alice"><a href="/profile/Bob">')
+    store.mark_crawled(['Carol'])
+    assert len(store) == 2
+    assert store.get_and_clear_cache() == {'Alice', 'Bob'}
+    store.close()
+
+    store = SQLiteUserStore(path)  # The next run
+    store.store_users(['Alice', 'Bob', 'Carol', 'Dave'])
+    assert store.get_and_clear_cache() == {'Dave'}
+    assert store.is_known('Alice') and not store.is_known('Eve')
+    store.close()
+
+
+def test_bloom_user_store_only_hands_out_new_users(tmpdir):
+    store = BloomUserStore(BloomFilter(1000))
+    store.store_users(['Alice', 'Bob'])
+    assert store.get_and_clear_cache() == {'Alice', 'Bob'}
+
+    path = str(tmpdir.join('seen.bloom'))
+    store.seen.save(path)
+    store = BloomUserStore(BloomFilter.load(path))  # The next run
+    store.store_users(['Alice', 'Carol'])
+    assert store.get_and_clear_cache() == {'Carol'}
+    assert store.is_known('Bob') and not store.is_known('Dave')
+    store.seen.close()
+
+
+def test_stores_must_implement_the_interface():
+    class IncompleteStore(UserStore):
+        def store_users(self, user_ids):
+            pass
+
+    with pytest.raises(TypeError):
+        IncompleteStore()
+
+    assert all(issubclass(store, UserStore) for store in (
+        MemoryUserStore, BloomUserStore, SQLiteUserStore,
+    ))
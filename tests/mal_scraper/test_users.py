@@ -1,9 +1,12 @@
 """Can we download user information?"""
 
+import json
+import os
 from datetime import date, datetime, timedelta
 
 import pytest
 import requests
+import responses
 
 import mal_scraper
 
@@ -81,6 +84,22 @@ class TestUserStats:
             mal_scraper.get_user_stats('asdghiuhunircg')
         assert err.value.code == mal_scraper.RequestError.Code.does_not_exist
 
+    def test_user_stats_many(self, mock_requests):
+        mock_requests.always_mock(self.TEST_USER_PAGE, 'user_test_page')
+        mock_requests.always_mock(
+            'http://myanimelist.net/profile/asdghiuhunircg',
+            'user_does_not_exist',
+            status=404,
+        )
+
+        user, missing = mal_scraper.get_user_stats_many(
+            [self.TEST_USER, 'asdghiuhunircg'], processes=2,
+        )
+        assert user.meta['user_id'] == self.TEST_USER
+        assert user.data['name'] == self.TEST_USER
+        assert isinstance(missing, mal_scraper.Failed)
+        assert missing.error.code == mal_scraper.RequestError.Code.does_not_exist
+
     def test_user_stats(self, mock_requests):
         """Do we retrieve the right stats about a user?"""
         # Always mock this because the user will change it himself
@@ -232,3 +251,125 @@ class TestUserAnimeList(object):
             'A masterpiece of failures. Yami wo Kirisaku',
             'LOAD THIS DRYER!',
         }
+
+    def load_small_entries(self, mock_requests):
+        filepath = os.path.join(mock_requests.MANUAL_DIR, 'user_anime_list_small')
+        with open(filepath, 'rb') as fin:
+            return json.loads(fin.read().decode('utf-8'))
+
+    def mock_small_pages(self, mock_requests, entries, offsets, page_size=60):
+        for offset in offsets:
+            mock_requests.rsps.add(
+                responses.GET,
+                self.LIST_URL.format(username=self.TEST_USER_SMALL_NAME, offset=offset),
+                json=entries[offset:offset + page_size],
+                match_querystring=True,
+            )
+
+    def test_concurrent_pages_are_merged_in_order(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+
+        # Pages of 60 (the last is short) then the empty page: offsets after
+        # the short page are speculated wrongly so they are never used
+        self.mock_small_pages(mock_requests, entries, (0, 60, 120, 158))
+
+        concurrent = mal_scraper.get_user_anime_list(
+            self.TEST_USER_SMALL_NAME, concurrency=3, limiter=None,
+        )
+        assert len(concurrent) == 158
+        assert [anime['id_ref'] for anime in concurrent] == [
+            anime['id_ref'] for anime in mal_scraper.users.get_user_anime_list_from_json(entries)
+        ]
+
+    def test_concurrent_stops_at_the_first_empty_page(self, mock_requests):
+        mock_requests.always_mock(self.TEST_USER_SMALL_PAGE, 'user_anime_list_small')
+        mock_requests.always_mock(self.TEST_USER_SMALL_END_PAGE, 'user_anime_list_end')
+
+        anime = mal_scraper.get_user_anime_list(
+            self.TEST_USER_SMALL_NAME, concurrency=4, limiter=None,
+        )
+        assert len(anime) == 158
+
+    def test_iter_anime_list_streams_each_page(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+        self.mock_small_pages(mock_requests, entries, (0, 60))
+
+        anime = mal_scraper.iter_user_anime_list(self.TEST_USER_SMALL_NAME, limiter=None)
+        first = next(anime)
+        assert first['id_ref'] == entries[0]['anime_id']
+        assert len(mock_requests.rsps.calls) == 1  # Only the first page so far
+
+        for _ in range(60):
+            next(anime)
+        assert len(mock_requests.rsps.calls) == 2
+        anime.close()
+
+    def test_iter_anime_list_in_pages(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+        self.mock_small_pages(mock_requests, entries, (0, 60, 120, 158))
+
+        pages = list(mal_scraper.iter_user_anime_list(
+            self.TEST_USER_SMALL_NAME, limiter=None, pages=True,
+        ))
+        assert [len(page) for page in pages] == [60, 60, 38]
+
+    def test_changes(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+        previous = mal_scraper.users.get_user_anime_list_from_json(entries)
+
+        entries[10] = dict(entries[10], score=7, tags='new, tags')
+        del entries[5]  # Removed
+        entries.append(dict(entries[0], anime_id=999999))  # Added
+        self.mock_small_pages(mock_requests, entries, (0, 60, 120, 158))
+
+        diff = mal_scraper.get_user_anime_list_changes(
+            self.TEST_USER_SMALL_NAME, previous, limiter=None,
+        )
+        assert diff.added == [999999]
+        assert diff.removed == [previous[5]['id_ref']]
+        assert diff.changed == {
+            previous[10]['id_ref']: {
+                'score': (previous[10]['score'], 7),
+                'tags': (set(), {'new', 'tags'}),
+            },
+        }
+        assert len(diff.anime) == 158
+        assert diff.fingerprint == mal_scraper.users.get_anime_list_fingerprint(diff.anime)
+        assert diff.fingerprint != mal_scraper.users.get_anime_list_fingerprint(previous)
+
+    def test_changes_retrieve_every_page(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+        previous = mal_scraper.users.get_user_anime_list_from_json(entries)
+
+        entries[150] = dict(entries[150], num_watched_episodes=100)  # After a same page
+        self.mock_small_pages(mock_requests, entries, (0, 60, 120, 158))
+
+        diff = mal_scraper.get_user_anime_list_changes(
+            self.TEST_USER_SMALL_NAME, previous, limiter=None,
+        )
+        assert list(diff.changed) == [previous[150]['id_ref']]
+
+    def test_list_can_guess_the_rest(self, mock_requests):
+        entries = self.load_small_entries(mock_requests)
+        previous = mal_scraper.users.get_user_anime_list_from_json(entries)
+
+        entries[10] = dict(entries[10], num_watched_episodes=100)
+        self.mock_small_pages(mock_requests, entries, (0, 60))  # Not the rest
+
+        anime, guessed = mal_scraper.users.get_user_anime_list_guessing_the_rest(
+            self.TEST_USER_SMALL_NAME, previous, limiter=None,
+        )
+        assert guessed
+        assert len(anime) == 158
+        added, removed, changed = mal_scraper.users.diff_user_anime_lists(previous, anime)
+        assert added == removed == []
+        assert list(changed) == [previous[10]['id_ref']]
+
+    def test_fingerprints_ignore_the_order(self):
+        anime = [
+            {'id_ref': id_ref, 'consumption_status': mal_scraper.ConsumptionStatus.completed,
+             'is_rewatch': False, 'score': 0, 'progress': 1, 'tags': {'b', 'a'}}
+            for id_ref in (1, 2)
+        ]
+        fingerprint = mal_scraper.users.get_anime_list_fingerprint
+        assert fingerprint(anime) == fingerprint(anime[::-1])